@@ -1,50 +1,144 @@
 # import modules
+from typing import NamedTuple
+
 import numpy as np
 import matplotlib.pyplot as plt
 import os
 
-# set seed for reproducibility
-np.random.seed(0)
 
-# parameters for the normal distribution
-vals = [1,2,3,4,5,6]
-population_mean = np.mean(vals)
-population_std = np.std(vals)
+class DecimatedMean(NamedTuple):
+    """Plot-ready summary of a cumulative-mean series (see stream_cumulative_mean)."""
+
+    n: np.ndarray         # sample counts of the points on the line
+    mean: np.ndarray      # cumulative mean at those counts
+    column_n: np.ndarray  # sample count at the end of each column
+    lo: np.ndarray        # minimum cumulative mean within each column
+    hi: np.ndarray        # maximum cumulative mean within each column
+
+
+def stream_cumulative_mean(draw, n, chunk_size=2**22, n_columns=2000, n_checkpoints=1000):
+    """
+    Cumulative mean of n draws, computed chunk by chunk and decimated for plotting.
+
+    The running sum is carried across chunks with Neumaier (compensated)
+    summation of each chunk's pairwise sum, and values are taken relative to
+    the first chunk's mean, so the float64 rounding error does not grow with n.
+    Only one chunk is held in memory. The series is reduced to
+    - exact values at n_checkpoints log-spaced counts and at the end of each
+      column, for the line, and
+    - the min/max within each of n_columns equal-width columns of counts
+      (about one per pixel), for an envelope that keeps every excursion
+      visible.
+    For n <= n_columns every point is kept.
+
+    Parameters:
+    -----------
+    draw : callable
+        draw(size) returns the next `size` samples as a float array
+    n : int
+        Total number of samples
+    chunk_size : int, optional (default=2**22)
+        Number of samples drawn at once
+    n_columns : int, optional (default=2000)
+        Number of envelope columns
+    n_checkpoints : int, optional (default=1000)
+        Number of log-spaced exact checkpoints
+
+    Returns:
+    --------
+    DecimatedMean
+    """
+    col_width = -(-n // n_columns)
+    n_cols = -(-n // col_width)
+    lo = np.full(n_cols, np.inf)
+    hi = np.full(n_cols, -np.inf)
+    last = np.empty(n_cols)
+    # 0-based sample indices of the checkpoints
+    checkpoints = np.unique(np.geomspace(1, n, n_checkpoints).astype(np.int64)) - 1
+    checkpoint_mean = np.empty(checkpoints.size)
+
+    shift = None
+    total, comp = 0.0, 0.0
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        x = np.asarray(draw(stop - start), dtype=float)
+        if shift is None:
+            shift = x.mean()
+        x -= shift
+        means = shift + ((total + comp) + np.cumsum(x)) / np.arange(start + 1, stop + 1)
+
+        # Neumaier update of the running sum with this chunk's pairwise sum
+        chunk_sum = x.sum()
+        t = total + chunk_sum
+        if abs(total) >= abs(chunk_sum):
+            comp += (total - t) + chunk_sum
+        else:
+            comp += (chunk_sum - t) + total
+        total = t
+
+        # Per-column min/max/last; a column may continue into the next chunk
+        first_col, last_col = start // col_width, (stop - 1) // col_width
+        bounds = np.arange((first_col + 1) * col_width, stop, col_width) - start
+        seg_starts = np.r_[0, bounds]
+        cols = slice(first_col, last_col + 1)
+        lo[cols] = np.minimum(lo[cols], np.minimum.reduceat(means, seg_starts))
+        hi[cols] = np.maximum(hi[cols], np.maximum.reduceat(means, seg_starts))
+        last[cols] = means[np.r_[bounds - 1, stop - start - 1]]
+
+        in_chunk = (checkpoints >= start) & (checkpoints < stop)
+        checkpoint_mean[in_chunk] = means[checkpoints[in_chunk] - start]
+
+    column_n = np.minimum(np.arange(1, n_cols + 1) * col_width, n)
+    line_n, order = np.unique(np.r_[checkpoints + 1, column_n], return_index=True)
+    line_mean = np.r_[checkpoint_mean, last][order]
+    return DecimatedMean(line_n, line_mean, column_n, lo, hi)
+
+
+if __name__ == "__main__":
+    # set seed for reproducibility
+    rng = np.random.default_rng(0)
 
-# different sample sizes
-sample_sizes = [10, 100, 1000, 10000]
+    # parameters for the normal distribution
+    vals = [1,2,3,4,5,6]
+    population_mean = np.mean(vals)
+    population_std = np.std(vals)
 
-# create a figure with 2x2 subplots
-fig, axs = plt.subplots(2, 2, figsize=(14, 10))
+    # different sample sizes
+    sample_sizes = [10, 1_000, 1_000_000, 1_000_000_000]
 
-for i, sample_size in enumerate(sample_sizes):
-    # Generate random samples
-    samples = np.random.normal(loc=population_mean, scale=population_std, size=sample_size)
+    # create a figure with 2x2 subplots
+    fig, axs = plt.subplots(2, 2, figsize=(14, 10))
 
-    # Compute the cumulative average of the samples
-    cumulative_avg = np.cumsum(samples) / np.arange(1, sample_size + 1)
+    for i, sample_size in enumerate(sample_sizes):
+        # Stream the random samples and compute their decimated cumulative average
+        cumulative_avg = stream_cumulative_mean(
+            lambda size: rng.normal(loc=population_mean, scale=population_std, size=size),
+            sample_size,
+        )
 
-    # Select the subplot
-    ax = axs[i//2, i%2]
+        # Select the subplot
+        ax = axs[i//2, i%2]
 
-    # Plot the cumulative average
-    ax.plot(cumulative_avg, label=f'Sample Size = {sample_size}')
-    ax.axhline(y=population_mean, color='r', linestyle='--', label='Population Mean')
-    ax.set_xlabel('Sample Size')
-    ax.set_ylabel('Sample Average')
-    ax.set_title(f'Sample Size = {sample_size}')
-    ax.legend()
-    ax.grid(True)
+        # Plot the cumulative average, with its min/max envelope per column
+        ax.fill_between(cumulative_avg.column_n, cumulative_avg.lo, cumulative_avg.hi,
+                        color='C0', alpha=0.3, linewidth=0)
+        ax.plot(cumulative_avg.n, cumulative_avg.mean, label=f'Sample Size = {sample_size:,}')
+        ax.axhline(y=population_mean, color='r', linestyle='--', label='Population Mean')
+        ax.set_xlabel('Sample Size')
+        ax.set_ylabel('Sample Average')
+        ax.set_title(f'Sample Size = {sample_size:,}')
+        ax.legend()
+        ax.grid(True)
 
-# adjust layout for better spacing
-plt.tight_layout()
+    # adjust layout for better spacing
+    plt.tight_layout()
 
-# create the 'plots' directory if it doesn't exist
-if not os.path.exists('plots'):
-    os.makedirs('plots')
+    # create the 'plots' directory if it doesn't exist
+    if not os.path.exists('plots'):
+        os.makedirs('plots')
 
-# save the figure
-plt.savefig('plots/240522_LLN_plots_2x2.png')
+    # save the figure
+    plt.savefig('plots/240522_LLN_plots_2x2.png')
 
-# Show the plot
-plt.show()
+    # Show the plot
+    plt.show()
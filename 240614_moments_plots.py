@@ -1,9 +1,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import norm, expon, t, truncnorm, skew, kurtosis
+from scipy.stats import norm, expon, t, truncnorm
+
+from streaming_stats import HistogramAccumulator, MomentAccumulator
 
 # --- CONFIGURATION ---
-NUM_SAMPLES = 10000
+NUM_SAMPLES = 10000  # drawn in chunks, so e.g. 1_000_000_000 runs in constant memory
+CHUNK_SIZE = 2**22  # samples drawn at once by draw_chunks
+NUM_BINS = 30
 DISTRIBUTIONS = {
     "Normal": {"dist": norm, "params": {"loc": 0, "scale": 1}, "color": "skyblue"},
     "Right-Skewed (Exponential)": {"dist": expon, "params": {"scale": 1}, "color": "salmon"},
@@ -16,13 +20,18 @@ DISTRIBUTIONS = {
 }
 
 # --- HELPER FUNCTIONS ---
-def calculate_stats(samples):
-    """Calculates mean, variance, skewness, and kurtosis of a sample."""
-    return [np.round(func(samples), 3) for func in (np.mean, np.var)] + [
-        round(skew(samples), 3),
-        round(kurtosis(samples), 3),
+def moment_stats(acc):
+    """Rounded mean, variance, skewness, and kurtosis of a MomentAccumulator."""
+    return [np.round(acc.mean, 3), np.round(acc.var(), 3)] + [
+        round(acc.skew(), 3),
+        round(acc.kurtosis(), 3),
     ]
 
+def draw_chunks(config, n, chunk_size=CHUNK_SIZE):
+    """Yields n draws from a DISTRIBUTIONS entry, chunk_size at a time."""
+    for start in range(0, n, chunk_size):
+        yield config["dist"].rvs(size=min(chunk_size, n - start), **config["params"])
+
 def format_stats(stats):
     """Formats statistics into a string for plot legends."""
     return (
@@ -33,22 +42,26 @@ def format_stats(stats):
 fig, axs = plt.subplots(2, 2, figsize=(14, 10))
 
 for i, (title, config) in enumerate(DISTRIBUTIONS.items()):
-    # Sample generation
-    samples = config["dist"].rvs(size=NUM_SAMPLES, **config["params"])
+    # Sample generation, reduced chunk by chunk to moments and histogram counts
+    # (bins over the first chunk's range: all samples if NUM_SAMPLES <= CHUNK_SIZE)
+    moments = MomentAccumulator()
+    hist, _ = HistogramAccumulator.from_stream(
+        draw_chunks(config, NUM_SAMPLES), bins=NUM_BINS, accumulators=[moments], name=title
+    )
 
     # Calculate and format statistics
-    stats = calculate_stats(samples)
+    stats = moment_stats(moments)
     stats_legend = format_stats(stats)
 
     # Plot
     ax = axs[i // 2, i % 2]  # Determine subplot position
-    ax.hist(samples, bins=30, density=True, alpha=0.7, color=config["color"], label=stats_legend)
+    hist.stairs(ax, alpha=0.7, color=config["color"], label=stats_legend)
     ax.set_title(title)
     ax.set_xlabel("Value")
     ax.set_ylabel("Density")
 
-    # Theoretical PDF
-    x = np.linspace(min(samples), max(samples), 100)
+    # Theoretical PDF, over the histogram's range
+    x = np.linspace(hist.edges[0], hist.edges[-1], 100)
     pdf = config["dist"].pdf(x, **config["params"])
     ax.plot(x, pdf, "r", linewidth=2)
     ax.legend(loc="upper right")
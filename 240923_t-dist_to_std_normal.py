@@ -1,8 +1,11 @@
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # frames are rasterized straight from the Agg canvas
 import matplotlib.pyplot as plt
 import scipy.stats as stats
-import imageio.v2 as imageio
-import os
+from PIL import Image
+
+from animation_render import encode_frames
 
 # Set up values for the x-axis (range of values for the distributions)
 x = np.linspace(-4, 4, 1000)
@@ -10,32 +13,35 @@ x = np.linspace(-4, 4, 1000)
 # Standard normal distribution (fixed for all frames)
 normal_dist = stats.norm.pdf(x)
 
+# Degrees of freedom, one frame each (use e.g. np.linspace(1, 30, 1000) for a
+# continuous-df animation)
+dfs = range(1, 31)
+
+# Create the plot once; only the t-curve, its legend entry and the title change per frame
+fig = plt.figure(figsize=(6, 4))
+plt.plot(x, normal_dist, label="Standard Normal", color='gray', linestyle='--', linewidth=2)
+t_line, = plt.plot(x, stats.t.pdf(x, dfs[0]), label="t-distribution", color='red', linewidth=2)
+title = plt.title("")
+plt.text(1.5, 0.35, "https://n.singh.phd", fontsize=10, color="gray")
+plt.xlabel('x')
+plt.ylabel('Probability Density')
+plt.ylim(0, 0.45)
+t_label = plt.legend().get_texts()[1]
+
 # List to store frames for the GIF
 frames = []
 
-# Create the t-distributions for df ranging from 1 to 100 and save each frame
-for df in range(1, 31):
-    t_dist = stats.t.pdf(x, df)
-    
-    # Create the plot
-    plt.figure(figsize=(6, 4))
-    plt.plot(x, normal_dist, label="Standard Normal", color='gray', linestyle='--', linewidth=2)
-    plt.plot(x, t_dist, label=f"t-distribution (df={df})", color='red', linewidth=2)
-    plt.title(f"t-distribution Converging to Normal (df = {df})")
-    plt.text(1.5, 0.35, "https://n.singh.phd", fontsize=10, color="gray")
-    plt.xlabel('x')
-    plt.ylabel('Probability Density')
-    plt.ylim(0, 0.45)
-    plt.legend()
-    
-    # Save the current plot as a frame in temp .png file
-    plt.savefig('plots/240923_t-dist_to_std_normal.png')
-    frames.append(imageio.imread('plots/240923_t-dist_to_std_normal.png'))
-    plt.close()
-
-# Save the frames as an animated GIF
-gif_path = 'plots/240923_t-dist_to_std_normal.gif'
-imageio.mimsave(gif_path, frames, fps=5, loop=0)
+# Update the t-distribution for each df and grab the rendered pixels in memory
+for df in dfs:
+    t_line.set_ydata(stats.t.pdf(x, df))
+    t_label.set_text(f"t-distribution (df={df:g})")
+    title.set_text(f"t-distribution Converging to Normal (df = {df:g})")
 
-# delete temp .png file
-os.remove('plots/240923_t-dist_to_std_normal.png')
\ No newline at end of file
+    fig.canvas.draw()
+    frames.append(Image.fromarray(np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()))
+
+plt.close(fig)
+
+# Save the frames as an animated GIF (see encode_frames for the palette choice)
+gif_path = 'plots/240923_t-dist_to_std_normal.gif'
+encode_frames(frames, gif_path, fps=5)
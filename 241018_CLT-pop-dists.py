@@ -1,44 +1,92 @@
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from scipy.stats import norm
+
+from binned_kde import binned_kde
+from animation_render import save_animation
+from clt_sampling import (
+    POPULATIONS,
+    build_clt_animation,
+    frame_counts,
+    standardized_edges,
+    standardized_means,
+)
+from streaming_stats import HistogramAccumulator
+
 # Set the seaborn style for plots
 sns.set(style="whitegrid")
 
-# Create data for different distributions
-x_normal = np.random.normal(loc=0, scale=1, size=1000)
-x_bimodal = np.concatenate([np.random.normal(-2, 0.5, 500), np.random.normal(3, 1, 500)])
-x_exponential = np.random.exponential(scale=1, size=1000)
-x_poisson = np.random.poisson(lam=3, size=1000)
-x_beta = np.random.beta(a=2, b=5, size=1000)
-x_uniform = np.random.uniform(low=0, high=1, size=1000)
+# Number of draws per population; drawn in chunks and binned as they arrive,
+# so e.g. 1_000_000_000 runs in constant memory
+NUM_SAMPLES = 1000
+CHUNK_SIZE = 2**22
+
+# Sampling distributions of the mean: sample sizes and replicate means per size
+SAMPLE_SIZES = [1, 5, 30, 1000]
+REPLICATES = 100_000
+
+# Animated sampling distribution: population, sample size and frames
+ANIMATION_POPULATION = "Exponential"
+ANIMATION_N = 30
+ANIMATION_FRAMES = 200
+REPLICATES_PER_FRAME = 100
+
+def plot_density_panel(ax, draw, color, title, bins=50, discrete=False, kde=True):
+    """
+    Plots a density histogram (and KDE) of NUM_SAMPLES draws, streamed in chunks.
+
+    The bins are taken from the first chunk's range (all draws if
+    NUM_SAMPLES <= CHUNK_SIZE, i.e. the bins sns.histplot would use; otherwise
+    padded, see HistogramAccumulator.from_stream), and the KDE is fitted to that
+    first chunk, over its range (histplot's cut=0), with the binned FFT
+    estimator (within 1e-4 of the peak of seaborn's curve).
+    """
+    chunks = (draw(min(CHUNK_SIZE, NUM_SAMPLES - start))
+              for start in range(0, NUM_SAMPLES, CHUNK_SIZE))
+    hist, pilot = HistogramAccumulator.from_stream(chunks, bins=bins, discrete=discrete, name=title)
+
+    # Same fill transparency as sns.histplot
+    hist.stairs(ax, color=color, alpha=0.5 if kde else 0.75)
+    if kde:
+        support, density = binned_kde(pilot, cut=0)
+        ax.plot(support, density, color=color)
+    ax.set_ylabel("Density")
+    ax.set_title(title)
+
+# Samplers for the different distributions
+draw_normal = lambda size: np.random.normal(loc=0, scale=1, size=size)
+draw_bimodal = lambda size: np.concatenate(
+    [np.random.normal(-2, 0.5, size // 2), np.random.normal(3, 1, size - size // 2)]
+)
+draw_exponential = lambda size: np.random.exponential(scale=1, size=size)
+draw_poisson = lambda size: np.random.poisson(lam=3, size=size)
+draw_beta = lambda size: np.random.beta(a=2, b=5, size=size)
+draw_uniform = lambda size: np.random.uniform(low=0, high=1, size=size)
 
 # Create new subplots for Probability Density Function (PDF) and Probability Mass Function (PMF) plots
 fig, axes = plt.subplots(3, 2, figsize=(12, 12))
 
 # Plot Normal Distribution PDF
-sns.histplot(x_normal, bins=50, kde=True, ax=axes[0, 0], color="blue", stat="density")
-axes[0, 0].set_title("Normal Distribution (PDF)")
+plot_density_panel(axes[0, 0], draw_normal, "blue", "Normal Distribution (PDF)")
 
 # Plot Bimodal Distribution PDF
-sns.histplot(x_bimodal, bins=50, kde=True, ax=axes[0, 1], color="green", stat="density")
-axes[0, 1].set_title("Bimodal Distribution (PDF)")
+plot_density_panel(axes[0, 1], draw_bimodal, "green", "Bimodal Distribution (PDF)")
 
 # Plot Exponential Distribution PDF
-sns.histplot(x_exponential, bins=50, kde=True, ax=axes[1, 0], color="red", stat="density")
-axes[1, 0].set_title("Exponential Distribution (PDF)")
+plot_density_panel(axes[1, 0], draw_exponential, "red", "Exponential Distribution (PDF)")
 
 # Plot Poisson Distribution PMF
-sns.histplot(x_poisson, bins=range(0, 15), discrete=True, kde=False, ax=axes[1, 1], color="purple", stat="density")
-axes[1, 1].set_title("Poisson Distribution (PMF)")
+plot_density_panel(axes[1, 1], draw_poisson, "purple", "Poisson Distribution (PMF)", discrete=True, kde=False)
 
 # Plot Beta Distribution PDF
-sns.histplot(x_beta, bins=50, kde=True, ax=axes[2, 0], color="orange", stat="density")
-axes[2, 0].set_title("Beta Distribution (PDF)")
+plot_density_panel(axes[2, 0], draw_beta, "orange", "Beta Distribution (PDF)")
 
 # Plot Uniform Distribution PDF
-sns.histplot(x_uniform, bins=50, kde=True, ax=axes[2, 1], color="brown", stat="density")
-axes[2, 1].set_title("Uniform Distribution (PDF)")
+plot_density_panel(axes[2, 1], draw_uniform, "brown", "Uniform Distribution (PDF)")
 
 # Adjust layout
 plt.tight_layout()
@@ -46,5 +94,47 @@ plt.tight_layout()
 # save plot
 plt.savefig('plots/241018_CLT-pop-dists.png')
 
-# Show the updated plot
+# Central limit theorem: distribution of the standardized sample mean of each
+# population for increasing sample sizes, against the standard normal
+rng = np.random.default_rng(0)
+z = np.linspace(-5, 5, 400)
+fig_clt, axes_clt = plt.subplots(3, 2, figsize=(12, 12))
+
+for ax, (name, population) in zip(axes_clt.flat, POPULATIONS.items()):
+    y_max = norm.pdf(0)
+    for n, color in zip(SAMPLE_SIZES, sns.color_palette("viridis", len(SAMPLE_SIZES))):
+        # (populations without a sum shortcut are drawn across all cores)
+        means = standardized_means(population, n, REPLICATES, rng, workers=os.cpu_count())
+        # lattice-aligned bins for the discrete (Poisson) population
+        hist = HistogramAccumulator(standardized_edges(population, n)).update(means)
+        hist.stairs(ax, fill=False, color=color, label=f"n = {n}")
+        y_max = max(y_max, hist.density().max())
+    ax.plot(z, norm.pdf(z), color="black", linestyle="--", label="Standard Normal")
+    ax.set_xlim(-5, 5)
+    ax.set_ylim(0, 1.05 * y_max)
+    ax.set_xlabel("Standardized Sample Mean")
+    ax.set_ylabel("Density")
+    ax.set_title(f"{name} Population: Sample Means")
+    ax.legend()
+
+plt.tight_layout()
+plt.savefig('plots/241018_CLT-sample-means.png')
+
+# Animate the sampling distribution filling in, REPLICATES_PER_FRAME means at a
+# time; each frame only bins its new means and updates one stairs artist (for a
+# live view, pass the same figure and update function to
+# FuncAnimation(fig, update, frames=ANIMATION_FRAMES, blit=True))
+anim_edges = standardized_edges(POPULATIONS[ANIMATION_POPULATION], ANIMATION_N, -4, 4)
+anim_counts = frame_counts(
+    POPULATIONS[ANIMATION_POPULATION], ANIMATION_N, REPLICATES_PER_FRAME, ANIMATION_FRAMES,
+    anim_edges, rng,
+)
+save_animation(
+    build_clt_animation, ANIMATION_FRAMES, 'plots/241018_CLT-sample-means.gif', fps=20,
+    workers=os.cpu_count(),
+    args=(anim_counts, anim_edges, f"{ANIMATION_POPULATION} Population: Means of n = {ANIMATION_N}",
+          REPLICATES_PER_FRAME),
+)
+
+# Show the updated plots
 plt.show()
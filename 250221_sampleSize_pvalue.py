@@ -1,7 +1,12 @@
+import os
+
 import numpy as np
-from scipy import stats
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from scipy import special
+
+from animation_render import save_animation
+from streaming_stats import MomentAccumulator
+from ttest_kernels import ttest_ind_from_moments
 
 # Set random seed for reproducibility
 np.random.seed(12345)
@@ -11,63 +16,231 @@ mu1 = 10    # Mean of first distribution
 mu2 = 10.01  # Mean of second distribution
 sigma = 1.0   # Same standard deviation for both
 
+# Sampling mode:
+# 'independent' - draw a brand-new pair of samples for every sample size
+# 'streaming'   - grow one pair of samples incrementally, so every point is the
+#                 same experiment observed at a larger n (constant memory, n up to 1e9)
+# 'analytic'    - no simulation; plot the median p-value from the noncentral t
+mode = 'independent'
+chunk_size = 1_000_000  # max draws held in memory at once in streaming mode
+show_reference = True   # overlay the analytic expected p-value and 95% band
+alpha = 0.05
+
+
+def grow_sample_stats(mu, sigma, sizes, chunk_size):
+    """
+    Grow one normal sample in chunks and report its mean and variance at each size.
+
+    The chunks are merged into a running MomentAccumulator (count, mean and
+    sum of squared deviations), so memory is bounded by chunk_size regardless
+    of the final sample size.
+    """
+    acc = MomentAccumulator(order=2)
+    means, variances = np.empty(len(sizes)), np.empty(len(sizes))
+    for i, target in enumerate(sizes):
+        while acc.count < target:
+            acc.update(np.random.normal(mu, sigma, min(chunk_size, target - acc.count)))
+        means[i], variances[i] = acc.mean, acc.var(ddof=1)
+    return means, variances
+
+
+def analytic_p_value_curves(sizes, mu1, mu2, sigma, quantiles=(0.025, 0.5, 0.975),
+                            alpha=0.05, exact_df_max=1e3, n_nodes=256, max_exact_sizes=256):
+    """
+    Expected p-value, p-value quantiles and power of Student's t-test across n.
+
+    With n observations per group the t statistic follows a noncentral t with
+    df = 2n - 2 and noncentrality (mu1 - mu2) / (sigma * sqrt(2 / n)). Beyond
+    exact_df_max degrees of freedom its normal limit N(nc, 1) is used, where the
+    expected p-value has the closed form 2 * Phi(nc / sqrt(2)) * Phi(-nc / sqrt(2)).
+    Everything is vectorized over sizes; no random numbers are drawn. Exact
+    noncentral t evaluations are costly, so when more than max_exact_sizes
+    sizes need them they are computed on a log-spaced grid of that many sizes
+    and interpolated (the curves are smooth in log n).
+
+    Returns a dict with 'expected' (len(sizes),), 'quantiles'
+    (len(quantiles), len(sizes)) and 'power' at the given alpha (len(sizes),).
+    """
+    n = np.asarray(sizes, dtype=float)
+    df = 2 * n - 2
+    nc = (mu1 - mu2) / (sigma * np.sqrt(2 / n))
+    exact = df <= exact_df_max
+
+    if exact.sum() > max_exact_sizes:
+        grid = np.geomspace(n[exact].min(), n[exact].max(), max_exact_sizes)
+        on_grid = analytic_p_value_curves(grid, mu1, mu2, sigma, quantiles, alpha,
+                                          exact_df_max, n_nodes, max_exact_sizes)
+        rest = analytic_p_value_curves(n[~exact], mu1, mu2, sigma, quantiles, alpha,
+                                       exact_df_max, n_nodes, max_exact_sizes)
+        log_n, log_grid = np.log(n[exact]), np.log(grid)
+        curves = {}
+        for key, values in on_grid.items():
+            # interpolate p-values on a log scale and power on a linear one
+            scale, unscale = (np.log, np.exp) if key != 'power' else (np.asarray, np.asarray)
+            dense = np.stack([unscale(np.interp(log_n, log_grid, scale(v)))
+                              for v in np.atleast_2d(values)])
+            full = np.empty(dense.shape[:-1] + n.shape)
+            full[..., exact], full[..., ~exact] = dense, rest[key]
+            curves[key] = full if values.ndim == 2 else full[0]
+        return curves
+
+    def abs_t_cdf(x, cols):
+        # P(|T| <= x) for the sizes selected by cols (x has a trailing sizes axis);
+        # |T| only depends on |nc|, and nctdtr's far tail is unreliable (it can
+        # return nan), so that tail is capped by the central t tail it never exceeds
+        out = np.empty(x.shape)
+        ex = exact[cols]
+        d, c = df[cols], np.abs(nc[cols])
+        far_tail = np.minimum(np.nan_to_num(special.nctdtr(d[ex], c[ex], -x[..., ex])),
+                              special.stdtr(d[ex], -x[..., ex]))
+        out[..., ex] = special.nctdtr(d[ex], c[ex], x[..., ex]) - far_tail
+        out[..., ~ex] = special.ndtr(x[..., ~ex] - c[~ex]) - special.ndtr(-x[..., ~ex] - c[~ex])
+        return out
+
+    # critical |t| at alpha and the power to exceed it
+    # (the t functions only where they are needed: at large df they are slow)
+    crit = np.full(n.shape, -special.ndtri(alpha / 2))
+    crit[exact] = -special.stdtrit(df[exact], alpha / 2)
+    power = 1 - abs_t_cdf(crit, slice(None))
+
+    # a p-value quantile q is the null p-value at the (1 - q) quantile of |T|
+    targets = 1 - np.asarray(quantiles, dtype=float)[:, None]
+    x = np.empty((len(quantiles), n.size))
+
+    # normal limit far from the null: the opposite tail of |T| is negligible
+    direct = ~exact & (np.abs(nc) > 5)
+    x[:, direct] = np.abs(nc[direct]) + special.ndtri(targets)
+
+    # normal limit near the null: Newton's method on P(|T| <= x), kept inside the
+    # bracket max(c + z(q), z((1 + q) / 2)) <= x <= c + z((1 + q) / 2) of the root
+    # (it reaches machine precision in 5 steps from the lower end)
+    cols = ~exact & ~direct
+    c = np.abs(nc[cols])
+    lo = np.maximum(c + special.ndtri(targets), special.ndtri((1 + targets) / 2))
+    hi = c + special.ndtri((1 + targets) / 2)
+    root = lo.copy()
+    for _ in range(6):
+        err = special.ndtr(root - c) - special.ndtr(-root - c) - targets
+        lo = np.where(err < 0, root, lo)
+        hi = np.where(err < 0, hi, root)
+        slope = (np.exp(-(root - c) ** 2 / 2) + np.exp(-(root + c) ** 2 / 2)) / np.sqrt(2 * np.pi)
+        step = root - err / slope
+        root = np.where((step >= lo) & (step <= hi), step, (lo + hi) / 2)
+    x[:, cols] = root
+
+    # exact noncentral t: bisect on the (monotone) distribution function of |T|
+    lo = np.zeros((len(quantiles), exact.sum()))
+    hi = np.broadcast_to(np.abs(nc[exact]) + 40.0, lo.shape).copy()
+    for _ in range(45):
+        mid = (lo + hi) / 2
+        below = abs_t_cdf(mid, exact) < targets
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    x[:, exact] = (lo + hi) / 2
+    p_quantiles = 2 * special.ndtr(-x)
+    p_quantiles[:, exact] = 2 * special.stdtr(df[exact], -x[:, exact])
+
+    # E[p] = P(|T0| >= |T|) = integral over u in (0, 1) of P(|T| <= x0(u)), where
+    # x0(u) is the u quantile of |T0| under the null (Gauss-Legendre in u)
+    expected = 2 * special.ndtr(nc / np.sqrt(2)) * special.ndtr(-nc / np.sqrt(2))
+    if exact.any():
+        nodes, weights = np.polynomial.legendre.leggauss(n_nodes)
+        u = (nodes[:, None] + 1) / 2
+        x0 = -special.stdtrit(df[exact], (1 - u) / 2)
+        expected[exact] = weights @ abs_t_cdf(x0, exact) / 2
+
+    return {'expected': expected, 'quantiles': p_quantiles, 'power': power}
+
+
 # Sample sizes to test (logarithmic scale from 100 to 1,000,000)
 sample_sizes = np.logspace(2, 6, num=100, dtype=int)
-p_values = []
-
-# Generate data and calculate p-values for each sample size
-for n in sample_sizes:
-    sample1 = np.random.normal(mu1, sigma, n)
-    sample2 = np.random.normal(mu2, sigma, n)
-    t_stat, p_val = stats.ttest_ind(sample1, sample2)
-    p_values.append(p_val)
-
-# Create animation
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.set_xscale('log')
-ax.set_yscale('log')
-ax.set_xlim(min(sample_sizes), max(sample_sizes))
-ax.set_ylim(1e-15, 2)
-ax.set_xlabel('Sample Size (n)')
-ax.set_ylabel('p-value')
-ax.set_title(f'p-value vs Sample Size\n(Comparing N({mu1},1) vs N({mu2},1))')
-ax.grid(True, which="both", ls="-", alpha=0.2)
-
-# Add significance line at 0.05
-ax.axhline(y=0.05, color='r', linestyle='--', label='p = 0.05')
-ax.legend(loc='lower left')
-
-# Add website text at bottom right
-website_text = ax.text(0.98, 0.02, 'https://n.singh.phd', 
-                      transform=ax.transAxes, 
-                      ha='right', 
-                      va='bottom',
-                      fontsize=10,
-                      color='gray')
-
-# Initial empty plot
-line, = ax.plot([], [], 'b-', label='p-value trend')
-scatter = ax.scatter([], [], c='blue', alpha=0.5)
-
-def init():
-    line.set_data([], [])
-    scatter.set_offsets(np.zeros((0, 2)))  # Initialize with empty 2D array
-    return line, scatter
-
-def animate(i):
-    # Update line plot
-    line.set_data(sample_sizes[:i+1], p_values[:i+1])
-    # Update scatter plot with proper 2D array
-    data = np.column_stack((sample_sizes[:i+1], p_values[:i+1]))
-    scatter.set_offsets(data)
-    return line, scatter
-
-# Create animation
-anim = FuncAnimation(fig, animate, init_func=init,
-                    frames=len(sample_sizes), interval=100, blit=True)
-
-# Save animation
-anim.save('plots/250221_sampleSize_pvalue.gif', writer='pillow')
+
+if mode == 'analytic' or show_reference:
+    reference = analytic_p_value_curves(sample_sizes, mu1, mu2, sigma, alpha=alpha)
+    powered = sample_sizes[reference['power'] >= 0.8]
+    if powered.size:
+        print(f'Power reaches 0.8 at alpha={alpha} from n = {powered[0]}')
+
+if mode == 'analytic':
+    # median p-value: a zero-variance curve, no Monte Carlo draws
+    p_values = analytic_p_value_curves(
+        sample_sizes, mu1, mu2, sigma, quantiles=(0.5,), alpha=alpha
+    )['quantiles'][0]
+else:
+    if mode == 'streaming':
+        means1, vars1 = grow_sample_stats(mu1, sigma, sample_sizes, chunk_size)
+        means2, vars2 = grow_sample_stats(mu2, sigma, sample_sizes, chunk_size)
+    else:
+        means1, vars1, means2, vars2 = (np.empty(len(sample_sizes)) for _ in range(4))
+
+        # Generate data and summarise each pair of samples
+        for i, n in enumerate(sample_sizes):
+            sample1 = np.random.normal(mu1, sigma, n)
+            sample2 = np.random.normal(mu2, sigma, n)
+            means1[i], vars1[i] = sample1.mean(), sample1.var(ddof=1)
+            means2[i], vars2[i] = sample2.mean(), sample2.var(ddof=1)
+
+    # Calculate p-values for all sample sizes in one call (Student's t-test)
+    p_values = ttest_ind_from_moments(
+        means1, vars1, sample_sizes, means2, vars2, sample_sizes, equal_var=True
+    ).pvalue
+
+def build_p_value_figure(sample_sizes, p_values, reference, mu1, mu2, alpha):
+    """Build the p-value figure and its frame-update function (see animation_render)."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlim(min(sample_sizes), max(sample_sizes))
+    ax.set_ylim(1e-15, 2)
+    ax.set_xlabel('Sample Size (n)')
+    ax.set_ylabel('p-value')
+    ax.set_title(f'p-value vs Sample Size\n(Comparing N({mu1},1) vs N({mu2},1))')
+    ax.grid(True, which="both", ls="-", alpha=0.2)
+
+    # Add significance line at 0.05
+    ax.axhline(y=alpha, color='r', linestyle='--', label=f'p = {alpha}')
+
+    # Overlay the analytic reference: expected p-value and 95% band of p-values
+    if reference is not None:
+        ax.fill_between(sample_sizes, reference['quantiles'][0], reference['quantiles'][-1],
+                        color='gray', alpha=0.2, lw=0, label='95% of p-values (theory)')
+        ax.plot(sample_sizes, reference['expected'], color='gray', ls=':',
+                label='expected p-value (theory)')
+    ax.legend(loc='lower left')
+
+    # Add website text at bottom right
+    ax.text(0.98, 0.02, 'https://n.singh.phd', 
+            transform=ax.transAxes, 
+            ha='right', 
+            va='bottom',
+            fontsize=10,
+            color='gray')
+
+    # Initial empty plot
+    line, = ax.plot([], [], 'b-', label='p-value trend')
+    scatter = ax.scatter([], [], c='blue', alpha=0.5)
+
+    def animate(i):
+        # Update line plot
+        line.set_data(sample_sizes[:i+1], p_values[:i+1])
+        # Update scatter plot with proper 2D array
+        data = np.column_stack((sample_sizes[:i+1], p_values[:i+1]))
+        scatter.set_offsets(data)
+        return line, scatter
+
+    return fig, animate
+
+
+# Create and save the animation (10 fps), rendering the frames across all cores
+figure_args = (sample_sizes, p_values, reference if show_reference else None, mu1, mu2, alpha)
+fig = save_animation(
+    build_p_value_figure, len(sample_sizes), 'plots/250221_sampleSize_pvalue.gif', fps=10,
+    workers=os.cpu_count(), args=figure_args,
+)
+if fig is None:
+    # rendered in worker processes: draw the final frame here to show it
+    fig, animate = build_p_value_figure(*figure_args)
+    animate(len(sample_sizes) - 1)
 
 # Show plot
-plt.show()
\ No newline at end of file
+plt.show()
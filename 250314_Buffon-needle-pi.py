@@ -1,9 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib import colors as mcolors
 from matplotlib import gridspec
-from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+
+from animation_render import save_animation
+
+def _needle_density_image(x_lo, x_hi, y_lo, y_hi, crosses, extent, resolution=400,
+                          samples=8, chunk_size=100_000):
+    """
+    Rasterize needles into an RGBA density image.
+
+    Each needle is sampled at evenly spaced points along its length and the
+    points are binned into a resolution x resolution grid, separately for
+    crossing and non-crossing needles. The image shows densities, so a few
+    points per needle suffice: with the default 8, a 1e6-needle panel
+    (draws, crossings and image) takes about half a second. Pixel colour blends red/blue by the
+    share of crossing needles and alpha grows with the local density.
+
+    Parameters:
+    x_lo, x_hi, y_lo, y_hi: np.ndarray - needle endpoints
+    crosses: np.ndarray of bool - whether each needle crosses a line
+    extent: tuple - (x_min, x_max, y_min, y_max) covered by the image
+    resolution: int - number of pixels per side (default=400)
+    samples: int - points sampled along each needle (default=8)
+    chunk_size: int - needles rasterized per chunk (default=100,000)
+
+    Returns:
+    np.ndarray - (resolution, resolution, 4) RGBA image, origin at the bottom
+    """
+    x_min, x_max, y_min, y_max = extent
+    t = np.linspace(0, 1, samples)
+    counts = np.zeros((2, resolution * resolution), dtype=np.int64)
 
-def buffon_needle_simulation(n, l=1, d=2, visualize=True, ax=None):
+    for start in range(0, x_lo.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        px = x_lo[sl, None] + (x_hi[sl] - x_lo[sl])[:, None] * t
+        py = y_lo[sl, None] + (y_hi[sl] - y_lo[sl])[:, None] * t
+        col = ((px - x_min) / (x_max - x_min) * resolution).astype(np.int64)
+        row = ((py - y_min) / (y_max - y_min) * resolution).astype(np.int64)
+        inside = (col >= 0) & (col < resolution) & (row >= 0) & (row < resolution)
+        flat = (row * resolution + col)[inside]
+        layer = np.broadcast_to(crosses[sl, None], inside.shape)[inside]
+        counts += np.bincount(layer * resolution * resolution + flat,
+                              minlength=2 * resolution * resolution).reshape(2, -1)
+
+    miss, hit = counts.reshape(2, resolution, resolution)
+    total = miss + hit
+    share = np.divide(hit, total, out=np.zeros(total.shape), where=total > 0)
+
+    image = np.empty((resolution, resolution, 4))
+    image[..., :3] = (share[..., None] * np.array(mcolors.to_rgb('red'))
+                      + (1 - share[..., None]) * np.array(mcolors.to_rgb('blue')))
+    image[..., 3] = 1 - np.exp(-total / max(total.mean(), 1))
+    return image
+
+def buffon_needle_simulation(n, l=1, d=2, visualize=True, ax=None, density_threshold=50_000):
     """
     Simulate Buffon's Needle problem and estimate pi.
 
@@ -13,6 +68,8 @@ def buffon_needle_simulation(n, l=1, d=2, visualize=True, ax=None):
     d: float - distance between lines (default=2)
     visualize: bool - whether to show needle visualization
     ax: matplotlib.axes - axis to plot on (optional)
+    density_threshold: int - above this many needles, draw a rasterized density
+        image instead of individual line segments (default=50,000)
 
     Returns:
     float - estimated value of pi
@@ -25,69 +82,166 @@ def buffon_needle_simulation(n, l=1, d=2, visualize=True, ax=None):
     pi_est = float('inf') if crossings == 0 else (2 * l * n) / (d * crossings)
     
     if visualize and ax is not None:
-        x = np.random.uniform(0, d, n)  # x distance from nearest line
+        x_center = np.random.uniform(0, d, n)  # x position of needle centre
+        y_center = np.random.uniform(0, 2*d, n)
         # Draw horizontal lines
         for i in range(-1, 3):
             ax.axhline(y=i*d, color='black', linestyle='--', alpha=0.3)
-            ax.minorticks_off()
-            
-        # Plot needles
-        for i in range(n):
-            x_center = x[i]  # Shift to center between lines
-            y_center = np.random.uniform(0, 2*d)
-            dx = (l/2) * np.cos(theta[i])
-            dy = (l/2) * np.sin(theta[i])
-            
-            # Calculate needle endpoints
-            y_bottom = y_center - dy
-            y_top = y_center + dy
-            
-            # Check if needle crosses any horizontal line
-            crosses = False
-            for line_y in [0, d, 2*d]:  # Check each line
-                if y_bottom < line_y < y_top:
-                    crosses = True
-                    break
-                    
-            color = 'red' if crosses else 'blue'
-            ax.plot([x_center - dx, x_center + dx], 
-                    [y_bottom, y_top], 
-                    color=color, alpha=0.5)
-            
+        ax.minorticks_off()
+
+        # Calculate needle endpoints
+        dx = (l/2) * np.cos(theta)
+        dy = (l/2) * np.sin(theta)
+        x_lo, x_hi = x_center - dx, x_center + dx
+        y_bottom, y_top = y_center - dy, y_center + dy
+
+        # Check if each needle crosses any horizontal line
+        lines_y = np.array([0, d, 2*d])
+        crosses = ((y_bottom[:, None] < lines_y) & (lines_y < y_top[:, None])).any(axis=1)
+
+        extent = (0, d, -0.5, 2.5*d)
+        if n > density_threshold:
+            image = _needle_density_image(x_lo, x_hi, y_bottom, y_top, crosses, extent)
+            ax.imshow(image, extent=extent, origin='lower', aspect='auto',
+                      interpolation='nearest')
+        else:
+            # Plot needles, one collection per colour
+            segments = np.stack([np.column_stack([x_lo, y_bottom]),
+                                 np.column_stack([x_hi, y_top])], axis=1)
+            for mask, color in ((crosses, 'red'), (~crosses, 'blue')):
+                ax.add_collection(LineCollection(segments[mask], colors=color, alpha=0.5))
+
         ax.set_title(f"n={n}, π estimate={pi_est:.4f}, Error={abs(np.pi - pi_est):.4f}")
         ax.set_xlabel("x")
         ax.set_ylabel("y")
-        ax.set_xlim(0, d)
-        ax.set_ylim(-0.5, 2.5*d)
+        ax.set_xlim(extent[:2])
+        ax.set_ylim(extent[2:])
         ax.grid(True, alpha=0.3, axis='y')
     
     return pi_est
 
-def run_tests(l=1, d=2, min_n=50, max_n=25000, step=250):
+def _stream_crossings(rng, start, stop, checkpoints, l, d, chunk_size):
     """
-    Run simulations and display results with an animated convergence plot in a grid,
-    saving the entire figure as a GIF.
+    Drop needles start..stop of a stream in chunks and count crossings.
 
     Parameters:
+    rng: np.random.Generator or the np.random module - source of draws
+    start: int - index of the first needle in this shard
+    stop: int - index one past the last needle in this shard
+    checkpoints: np.ndarray - sorted needle counts at which to report
     l: float - length of needle
     d: float - distance between lines
-    max_n: int - maximum number of needles for convergence
-    step: int - increment of n between simulations
+    chunk_size: int - number of needles drawn per chunk
+
+    Returns:
+    tuple - (crossings up to each checkpoint in (start, stop], counted from
+    start; total crossings in the shard)
+    """
+    lo = np.searchsorted(checkpoints, start, side='right')
+    hi = np.searchsorted(checkpoints, stop, side='right')
+    local_counts = np.zeros(hi - lo, dtype=np.int64)
+    crossings = 0
+
+    for chunk_start in range(start, stop, chunk_size):
+        size = min(chunk_size, stop - chunk_start)
+        x = rng.uniform(0, d/2, size)
+        theta = rng.uniform(0, np.pi/2, size)
+        running = crossings + np.cumsum(x <= (l/2) * np.sin(theta))
+
+        # checkpoints that fall inside this chunk read the running count
+        c_lo = np.searchsorted(checkpoints, chunk_start, side='right')
+        c_hi = np.searchsorted(checkpoints, chunk_start + size, side='right')
+        local_counts[c_lo - lo:c_hi - lo] = running[checkpoints[c_lo:c_hi] - chunk_start - 1]
+        crossings = int(running[-1])
+
+    return local_counts, crossings
+
+def _shard_crossings(seed_seq, start, stop, checkpoints, l, d, chunk_size):
+    """Worker entry point: run one shard on its own child random stream."""
+    rng = np.random.default_rng(seed_seq)
+    return _stream_crossings(rng, start, stop, checkpoints, l, d, chunk_size)
+
+def buffon_needle_convergence(checkpoints, l=1, d=2, chunk_size=1_000_000,
+                              seed=None, workers=1):
+    """
+    Estimate pi at every checkpoint from a single stream of needle drops.
+
+    Needles are drawn in fixed-size chunks and the running crossing count is
+    carried across chunks, so the whole convergence curve costs one pass over
+    max(checkpoints) needles and memory stays bounded by chunk_size.
+
+    With a seed, the stream is split into `workers` contiguous shards, each
+    drawn from its own SeedSequence.spawn child in a separate process, and the
+    shard counts are merged in order. The result is bit-identical for a given
+    seed, worker count and chunk_size (each chunk draws its x values and then
+    its angles, so a different chunking reorders the draws).
+
+    Parameters:
+    checkpoints: array-like of int - increasing positive needle counts at which to report
+    l: float - length of needle (default=1)
+    d: float - distance between lines (default=2)
+    chunk_size: int - number of needles drawn per chunk (default=1,000,000)
+    seed: int or None - seed for the per-shard streams; None draws from the
+        global np.random state in this process (default=None)
+    workers: int - number of shards / worker processes, requires a seed (default=1)
+
+    Returns:
+    np.ndarray - estimated value of pi at each checkpoint
+    """
+    checkpoints = np.asarray(checkpoints, dtype=np.int64)
+    if checkpoints.size and np.any(np.diff(checkpoints) <= 0):
+        raise ValueError("checkpoints must be strictly increasing")
+    if checkpoints.size and checkpoints[0] < 1:
+        raise ValueError("checkpoints must be positive (at least one needle)")
+    if seed is None and workers != 1:
+        raise ValueError("a seed is required to run with more than one worker")
+
+    total = int(checkpoints[-1]) if checkpoints.size else 0
+
+    if seed is None:
+        crossings_at, _ = _stream_crossings(np.random, 0, total, checkpoints, l, d, chunk_size)
+    else:
+        bounds = np.linspace(0, total, workers + 1).astype(np.int64)
+        children = np.random.SeedSequence(seed).spawn(workers)
+        jobs = [(children[i], int(bounds[i]), int(bounds[i + 1]), checkpoints, l, d, chunk_size)
+                for i in range(workers)]
+
+        if workers == 1:
+            results = [_shard_crossings(*jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_shard_crossings, *zip(*jobs)))
+
+        # offset each shard's local counts by the crossings of the shards before it
+        offsets = np.cumsum([0] + [total_i for _, total_i in results[:-1]])
+        crossings_at = np.concatenate(
+            [local + offset for (local, _), offset in zip(results, offsets)]
+        )
+
+    with np.errstate(divide='ignore'):
+        return (2 * l * checkpoints) / (d * crossings_at)
+
+def build_figure(l, d, test_ns, panel_seed, min_n, max_n, n_values, pi_estimates):
+    """
+    Build the needle panels and the convergence plot, and its frame-update function.
+
+    Module-level and deterministic (each static panel is drawn after seeding the
+    global state with panel_seed + panel index) so that worker processes can
+    rebuild the same figure (see animation_render.save_animation).
+
+    Returns:
+    tuple - (figure, update function drawing the convergence line up to a frame)
     """
     # Set up figure and GridSpec layout
     fig = plt.figure(figsize=(12, 10))
     gs = gridspec.GridSpec(2, 2, height_ratios=[1, 1])
     
     # First row: Two needle simulations (static)
-    test_ns = [min_n, 1000]
     axs = [plt.subplot(gs[0, 0]), plt.subplot(gs[0, 1])]
     
     for idx, n in enumerate(test_ns):
-        pi_estimate = buffon_needle_simulation(n, l, d, visualize=True, ax=axs[idx])
-        print(f"Number of needles: {n}")
-        print(f"Estimated π: {pi_estimate:.4f}")
-        print(f"Absolute error: {abs(np.pi - pi_estimate):.4f}")
-        print("-" * 40)
+        np.random.seed(panel_seed + idx)
+        buffon_needle_simulation(n, l, d, visualize=True, ax=axs[idx])
     
     # Second row: Animated convergence plot spanning both columns
     ax_conv = plt.subplot(gs[1, :])
@@ -100,10 +254,6 @@ def run_tests(l=1, d=2, min_n=50, max_n=25000, step=250):
     ax_conv.axhline(y=np.pi, color='r', linestyle='--', label='True π')
     ax_conv.legend()
 
-    # Data for animation
-    n_values = list(range(min_n, max_n + 1, step))
-    pi_estimates = [buffon_needle_simulation(n, l, d, visualize=False) for n in n_values]
-    
     # Initialize line for animation
     line, = ax_conv.plot([], [], 'b-o', label='Estimated π', alpha=0.5)
 
@@ -115,30 +265,59 @@ def run_tests(l=1, d=2, min_n=50, max_n=25000, step=250):
                         horizontalalignment='right',
                         bbox=dict(facecolor='white', alpha=0.8))
     
-    # # Animation initialization function
-    # def init():
-    #     line.set_data([], [])
-    #     return line, website_text
-    
     # Animation update function
     def update(frame):
         line.set_data(n_values[:frame+1], pi_estimates[:frame+1])
         return line, website_text
     
-    # Create animation
-    anim = FuncAnimation(fig, update, init_func=None, frames=len(n_values), blit=True, repeat=False)
-    
     # Add overall title and adjust layout
     fig.suptitle(f"Buffon's Needle Experiment (l={l}, d={d})", fontsize=16)
     plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+    return fig, update
+
+def run_tests(l=1, d=2, min_n=50, max_n=25000, step=250, seed=None, workers=1,
+              panel_seed=12345, render_workers=1):
+    """
+    Run simulations and display results with an animated convergence plot in a grid,
+    saving the entire figure as a GIF.
+
+    Parameters:
+    l: float - length of needle
+    d: float - distance between lines
+    max_n: int - maximum number of needles for convergence
+    step: int - increment of n between simulations
+    seed: int or None - seed for the convergence stream (see buffon_needle_convergence)
+    workers: int - number of worker processes for the convergence stream
+    panel_seed: int - seed for the static needle panels
+    render_workers: int - number of worker processes rendering the animation frames
+    """
+    test_ns = [min_n, 1000]
+
+    # Static panels: the same seeded draws that build_figure plots
+    for idx, n in enumerate(test_ns):
+        np.random.seed(panel_seed + idx)
+        pi_estimate = buffon_needle_simulation(n, l, d, visualize=False)
+        print(f"Number of needles: {n}")
+        print(f"Estimated π: {pi_estimate:.4f}")
+        print(f"Absolute error: {abs(np.pi - pi_estimate):.4f}")
+        print("-" * 40)
+
+    # Data for animation: one stream of needles, read off at every checkpoint
+    n_values = np.arange(min_n, max_n + 1, step)
+    pi_estimates = buffon_needle_convergence(n_values, l, d, seed=seed, workers=workers)
     
-    # Save as GIF using Pillow writer
-    anim.save('plots/250314_Buffon-needle-pi.gif', writer='pillow', fps=30)
+    # Save as GIF, rendering the frames across render_workers processes
+    save_animation(
+        build_figure, len(n_values), 'plots/250314_Buffon-needle-pi.gif', fps=30,
+        workers=render_workers,
+        args=(l, d, test_ns, panel_seed, min_n, max_n, n_values, pi_estimates),
+    )
     
     # Print final estimate
-    print(f"Final estimate with n={max_n}: {pi_estimates[-1]:.4f}")
+    print(f"Final estimate with n={n_values[-1]}: {pi_estimates[-1]:.4f}")
     print(f"Absolute error: {abs(np.pi - pi_estimates[-1]):.4f}")
 
 if __name__ == "__main__":
-    np.random.seed(12345)
-    run_tests(l=1, d=2, min_n=50, max_n=50000, step=250)
\ No newline at end of file
+    run_tests(l=1, d=2, min_n=50, max_n=50000, step=250, seed=12345,
+              render_workers=os.cpu_count())
@@ -1,58 +1,100 @@
+import os
+
 import numpy as np
-from scipy import stats
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+
+from animation_render import save_animation
+from ttest_kernels import ttest_ind_rows
 
 np.set_printoptions(legacy='1.25')
 
+# simulation size: the animation shows one frame per checkpoint
+n_checkpoints = 300
+exp_per_checkpoint = 100
+sample_size = 100
+max_exp_per_draw = 10_000  # caps the (experiments x sample_size) draw per batch
+
+
+class CoverageAccumulator:
+    """
+    Running count of experiments whose CI contains the true parameter.
+
+    Keeps integer counts instead of the per-experiment outcomes, and records the
+    cumulative coverage into preallocated arrays at each checkpoint, so memory
+    is O(checkpoints) no matter how many experiments are run.
+    """
+
+    def __init__(self, n_checkpoints):
+        self.n_covered = 0
+        self.n_total = 0
+        self.n_exp = np.zeros(n_checkpoints, dtype=np.int64)
+        self.pct_covered = np.zeros(n_checkpoints)
+        self._n_recorded = 0
+
+    def update(self, covered):
+        """Add a batch of boolean CI-contains-parameter outcomes."""
+        self.n_covered += int(np.count_nonzero(covered))
+        self.n_total += covered.size
+
+    def checkpoint(self):
+        """Record the cumulative experiment count and coverage so far."""
+        self.n_exp[self._n_recorded] = self.n_total
+        self.pct_covered[self._n_recorded] = self.n_covered / self.n_total
+        self._n_recorded += 1
+
+
 # simulate a random normal population (mean 167, sd 4)
 rng = np.random.default_rng(12345)
 pop = rng.normal(loc=167, scale=4, size=10000)
 
-# initiate empty arrays to hold values
-is_in_CI = np.array([])
-n_exp = np.array([])
-pct_exp_w_true_param = np.array([])
-
-for _ in range(300):
-    for _ in range(100):
-        # choose two random samples
-        sample1 = rng.choice(pop, size=100, replace=True)
-        sample2 = rng.choice(pop, size=100, replace=True)
-        ttest_res = stats.ttest_ind(sample1, sample2, equal_var=False)
-        conf_int = ttest_res.confidence_interval(confidence_level=0.95)
-        is_in_CI = np.append(is_in_CI, [min(conf_int) <= 0 <= max(conf_int)])
-    n_exp = np.append(n_exp, is_in_CI.size)
-    pct_exp_w_true_param = np.append(pct_exp_w_true_param, is_in_CI.sum() / is_in_CI.size)
+coverage = CoverageAccumulator(n_checkpoints)
+
+for _ in range(n_checkpoints):
+    for start in range(0, exp_per_checkpoint, max_exp_per_draw):
+        n_batch = min(max_exp_per_draw, exp_per_checkpoint - start)
+        # choose two random samples for each experiment (one per row)
+        sample1 = rng.choice(pop, size=(n_batch, sample_size), replace=True)
+        sample2 = rng.choice(pop, size=(n_batch, sample_size), replace=True)
+        ttest_res = ttest_ind_rows(sample1, sample2, equal_var=False, confidence_level=0.95)
+        coverage.update((ttest_res.ci_low <= 0) & (0 <= ttest_res.ci_high))
+    coverage.checkpoint()
+
+n_exp = coverage.n_exp
+pct_exp_w_true_param = coverage.pct_covered
 
 # sanity check
-print(f'{is_in_CI.sum()}')
+print(f'{coverage.n_covered}')
 print(max(n_exp))
 print(pct_exp_w_true_param[-1])
 
-fig, ax = plt.subplots()
-line, = ax.plot([], [], 'b-') # Initialize an empty line, 'r-' for red line
-ax.axhline(y=0.95, color='lightgray', linestyle='--', zorder=0)
 
-# set plot limits
-ax.set_xlim(0, n_exp.max())
-ax.set_ylim(pct_exp_w_true_param.min(), 1)
+def build_coverage_figure(n_exp, pct_exp_w_true_param):
+    """Build the coverage figure and its frame-update function (see animation_render)."""
+    fig, ax = plt.subplots()
+    line, = ax.plot([], [], 'b-') # Initialize an empty line, 'r-' for red line
+    ax.axhline(y=0.95, color='lightgray', linestyle='--', zorder=0)
+
+    # set plot limits
+    ax.set_xlim(0, n_exp.max())
+    ax.set_ylim(pct_exp_w_true_param.min(), 1)
+
+    # set labels and title
+    ax.set_xlabel("# experiments")
+    ax.set_ylabel("% CIs containing true pop parameter")
+    ax.set_title("Visual representation of \n % CIs containing true parameter reaching the threshold")
 
-# set labels and title
-ax.set_xlabel("# experiments")
-ax.set_ylabel("% CIs containing true pop parameter")
-ax.set_title("Visual representation of \n % CIs containing true parameter reaching the threshold")
+    # Add website text in the top right corner
+    website_text = "https://n.singh.phd"
+    ax.text(0.97 * n_exp.max(), 0.995, website_text, fontsize=10, color="gray", ha="right")
 
-# Add website text in the top right corner
-website_text = "https://n.singh.phd"
-ax.text(29000, 0.995, website_text, fontsize=10, color="gray", ha="right")
+    # animation update function
+    def update(frame):
+        line.set_data(n_exp[:frame+1], pct_exp_w_true_param[:frame+1])
+        return line,
 
-# animation update function
-def update(frame):
-    line.set_data(n_exp[:frame+1], pct_exp_w_true_param[:frame+1])
-    return line,
+    return fig, update
 
-# create
-anim = FuncAnimation(fig, update, init_func=None, frames=len(n_exp), blit=True, repeat=False)
 
-anim.save('plots/250612_CI-convergence.gif', writer='pillow', fps=30)
+# create and save, rendering the frames across all cores
+save_animation(build_coverage_figure, len(n_exp), 'plots/250612_CI-convergence.gif', fps=30,
+               workers=os.cpu_count(), args=(n_exp, pct_exp_w_true_param))
@@ -9,9 +9,13 @@ Author: N. Singh, PhD
 Date: August 19, 2025
 """
 
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+
+from animation_render import save_animation
+from streaming_stats import MomentAccumulator
 
 
 class SDvsSE:
@@ -45,6 +49,9 @@ class SDvsSE:
         self.n_sample_sizes: list = []
         self.sds: list = []
         self.ses: list = []
+        # 2.5/50/97.5 percentiles over replicates, shape (3, n_sizes) (see replicate_stats)
+        self.sd_bands = None
+        self.se_bands = None
 
     def get_random_sample(self, size):
         """
@@ -102,7 +109,88 @@ class SDvsSE:
         self.ses = np.array(self.ses)
         self.n_sample_sizes = np.array(self.n_sample_sizes)
 
-    def plot_sd_vs_se(self, output_path):
+    def stream_stats(self, sizes, chunk_size=1_000_000):
+        """
+        Calculate SD and SE for each sample size without keeping the samples.
+
+        Memory-lean alternative to generate_n_random_samples + calc_stats:
+        each sample is drawn in chunks of at most chunk_size population indices
+        and merged into a running MomentAccumulator, so only one chunk is ever
+        held in memory.
+
+        Parameters:
+        -----------
+        sizes : iterable of int
+            Sample sizes; may be a lazy iterator or generator
+        chunk_size : int, optional (default=1,000,000)
+            Maximum number of observations drawn at once
+
+        Notes:
+        ------
+        Results are stored in self.sds, self.ses, and self.n_sample_sizes arrays,
+        as with calc_stats; self.n_samples is left empty
+        """
+        n_sample_sizes, sds, ses = [], [], []
+        for size in sizes:
+            acc = MomentAccumulator(order=2)
+            while acc.count < size:
+                idx = self.rng.integers(0, self.n, size=min(chunk_size, size - acc.count))
+                acc.update(self.data[idx])
+            sd = np.sqrt(acc.var(ddof=1))  # Sample standard deviation
+            n_sample_sizes.append(size)
+            sds.append(sd)
+            ses.append(sd / np.sqrt(size))
+        self.n_sample_sizes = np.array(n_sample_sizes)
+        self.sds = np.array(sds)
+        self.ses = np.array(ses)
+
+    def replicate_stats(self, sizes, replicates=1000, max_elements=2**24):
+        """
+        Calculate SD and SE percentile bands over many resamples per sample size.
+
+        For each size, `replicates` samples are drawn at once as a
+        (replicates x size) matrix of population indices, split along the
+        replicate axis so that no block holds more than max_elements draws,
+        and the per-replicate SDs are reduced to their median and 2.5/97.5
+        percentiles.
+
+        Parameters:
+        -----------
+        sizes : iterable of int
+            Sample sizes
+        replicates : int, optional (default=1000)
+            Number of samples drawn per size
+        max_elements : int, optional (default=2**24)
+            Maximum number of observations drawn at once (memory cap)
+
+        Notes:
+        ------
+        The percentile bands are stored in self.sd_bands and self.se_bands
+        (rows: 2.5th, 50th, 97.5th percentile); self.sds and self.ses hold
+        the medians, so plot_sd_vs_se draws the median lines inside the bands
+        """
+        # Centre the population so the one-pass sum / sum-of-squares variance
+        # below does not lose precision to cancellation
+        centred = self.data - self.data.mean()
+        n_sample_sizes, sd_bands = [], []
+        for size in sizes:
+            rows = max(1, max_elements // size)
+            sds = np.empty(replicates)
+            for start in range(0, replicates, rows):
+                stop = min(start + rows, replicates)
+                idx = self.rng.integers(0, self.n, size=(stop - start, size), dtype=np.int32)
+                block = centred[idx]
+                total = block.sum(axis=1)
+                sum_sq = np.einsum('ij,ij->i', block, block)
+                sds[start:stop] = np.sqrt((sum_sq - total**2 / size) / (size - 1))
+            n_sample_sizes.append(size)
+            sd_bands.append(np.percentile(sds, [2.5, 50, 97.5]))
+        self.n_sample_sizes = np.array(n_sample_sizes)
+        self.sd_bands = np.array(sd_bands).T
+        self.se_bands = self.sd_bands / np.sqrt(self.n_sample_sizes)
+        self.sds, self.ses = self.sd_bands[1], self.se_bands[1]
+
+    def plot_sd_vs_se(self, output_path, workers=1):
         """
         Create an animated plot showing SD vs SE as sample size increases.
         
@@ -110,56 +198,92 @@ class SDvsSE:
         -----------
         output_path : str
             Path where the animated GIF will be saved
+        workers : int, optional (default=1)
+            Number of processes used to render the frames
             
         Notes:
         ------
         - Blue line shows Standard Deviation (relatively constant)
         - Red line shows Standard Error (decreases with sample size)
         - Gray dashed line shows the true population standard deviation
+        - After replicate_stats, shaded envelopes show the 2.5-97.5 percentile
+          bands around the median lines
         - Animation shows points appearing sequentially as sample size increases
         """
-        fig, ax = plt.subplots()
-        # Initialize empty lines for animation
-        line_sd, = ax.plot([], [], 'b-o', label='SD', markersize=2)
-        line_se, = ax.plot([], [], 'r-o', label='SE', markersize=2)
-        # Add reference line for true population standard deviation
-        ax.axhline(y=self.sd, color='lightgray', linestyle='--', zorder=0)
-
-        # Set plot limits and labels
-        ax.set_xlim(self.n_sample_sizes.min(), self.n_sample_sizes.max())
-        ax.set_ylim(0, self.sds.max() + 0.1)
-
-        ax.set_xlabel("Sample Size")
-        ax.set_ylabel("Standard Deviation and Standard Error")
-        ax.set_title("Impact of increased sample size on \n standard deviation and standard error", fontsize=14)
-
-        # Add watermark
-        ax.text(x=9500, y=0.2, s="https://n.singh.phd", fontsize=10, color="gray", ha="right")
-        ax.legend()
-
-        def update(frame):
-            """Animation function: updates lines with data up to current frame."""
-            line_sd.set_data(self.n_sample_sizes[:frame+1], self.sds[:frame+1])
-            line_se.set_data(self.n_sample_sizes[:frame+1], self.ses[:frame+1])
+        save_animation(
+            _build_sd_se_figure, len(self.n_sample_sizes), output_path, fps=30,
+            workers=workers,
+            args=(self.n_sample_sizes, self.sds, self.ses, self.sd, self.sd_bands, self.se_bands)
+        )
+
+
+def _build_sd_se_figure(n_sample_sizes, sds, ses, sd, sd_bands=None, se_bands=None):
+    """
+    Build the SD vs SE figure and its frame-update function.
+
+    If sd_bands and se_bands (rows: lower, median, upper) are given, the
+    lower-upper range is drawn as a filled envelope behind each line.
+
+    Module-level so that worker processes can rebuild the figure
+    (see animation_render.save_animation).
+
+    Returns:
+    --------
+    tuple
+        (figure, update function drawing the lines up to a given frame)
+    """
+    fig, ax = plt.subplots()
+    # Initialize empty lines for animation
+    line_sd, = ax.plot([], [], 'b-o', label='SD', markersize=2)
+    line_se, = ax.plot([], [], 'r-o', label='SE', markersize=2)
+    # Add reference line for true population standard deviation
+    ax.axhline(y=sd, color='lightgray', linestyle='--', zorder=0)
+
+    # Set plot limits and labels
+    ax.set_xlim(n_sample_sizes.min(), n_sample_sizes.max())
+    ax.set_ylim(0, (sds.max() if sd_bands is None else sd_bands[2].max()) + 0.1)
+
+    ax.set_xlabel("Sample Size")
+    ax.set_ylabel("Standard Deviation and Standard Error")
+    ax.set_title("Impact of increased sample size on \n standard deviation and standard error", fontsize=14)
+
+    # Add watermark
+    ax.text(x=9500, y=0.2, s="https://n.singh.phd", fontsize=10, color="gray", ha="right")
+    ax.legend()
+    envelopes = []
+
+    def update(frame):
+        """Animation function: updates lines (and envelopes) with data up to current frame."""
+        line_sd.set_data(n_sample_sizes[:frame+1], sds[:frame+1])
+        line_se.set_data(n_sample_sizes[:frame+1], ses[:frame+1])
+        if sd_bands is None:
             return line_sd, line_se
+        # Redraw the envelopes up to the current frame
+        while envelopes:
+            envelopes.pop().remove()
+        for bands, color in ((sd_bands, 'b'), (se_bands, 'r')):
+            envelopes.append(ax.fill_between(
+                n_sample_sizes[:frame+1], bands[0, :frame+1], bands[2, :frame+1],
+                color=color, alpha=0.2, linewidth=0, zorder=1
+            ))
+        return line_sd, line_se, *envelopes
 
-        # Create and save animation
-        anim = FuncAnimation(
-            fig, update, frames=len(self.n_sample_sizes),
-            blit=True, repeat=False
-        )
-        anim.save(output_path, writer='pillow', fps=30)
+    return fig, update
 
 
 if __name__ == "__main__":
     # Main execution block: demonstrates the SD vs SE relationship.
     # Creates a population of 10,000 normally distributed values, then:
-    # 1. Generates samples of varying sizes (50 to 10,000 in steps of 100)
-    # 2. Calculates SD and SE for each sample size
+    # 1. Draws samples of varying sizes (50 to 10,000 in steps of 100) and
+    # 2. calculates SD and SE for each sample size as it is drawn
+    #    (replicates > 1: median and 95% bands over that many samples per size)
     # 3. Creates an animated visualization showing the relationship
     
     sd_vs_se = SDvsSE(n=10000, mean=0, sd=1)
-    sample_sizes = np.arange(50, 10000, 100)
-    sd_vs_se.generate_n_random_samples(sample_sizes)
-    sd_vs_se.calc_stats()
-    sd_vs_se.plot_sd_vs_se(output_path='plots/250819_SD-and-SE_vs_N.gif')
+    sample_sizes = range(50, 10000, 100)
+    replicates = 1000
+    if replicates > 1:
+        sd_vs_se.replicate_stats(sample_sizes, replicates=replicates)
+    else:
+        sd_vs_se.stream_stats(sample_sizes)
+    sd_vs_se.plot_sd_vs_se(output_path='plots/250819_SD-and-SE_vs_N.gif', workers=os.cpu_count())
@@ -12,31 +12,98 @@ from plotnine import (
     theme,
 )
 
+from nobel_sql import SqlPrizeAggregates, append_prizes, read_prizes, write_prizes
+from nobel_store import LaureateIndex, PrizeAggregates, load_laureate_index, load_nobel_data
+
 
 class NobelData:
-    def __init__(self, data):
-        self.data = pd.DataFrame(data)
+    def __init__(self, data=None, laureate_index=None, engine=None):
+        # with a SQLAlchemy engine the prize rows live in the database (see
+        # nobel_sql): the summaries run there as GROUP BY queries and the rows
+        # are only read into pandas if `data` is used; data passed with an
+        # engine replaces the rows in the database
+        self.engine = engine
+        # appended rows are kept as separate frames until `data` is read
+        self._chunks = [] if data is None else [pd.DataFrame(data)]
+        if engine is not None and data is not None:
+            write_prizes(engine, self._chunks[0])
+        # one row per (laureate, prize) with a name index; built on first use
+        # unless a (persisted) LaureateIndex is passed in
+        self._laureate_index = laureate_index
+        # running sums/counts behind the summaries; built on first use
+        self._aggregates = None if engine is None else SqlPrizeAggregates(engine)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if not self._chunks and self.engine is not None:
+            self._chunks = [read_prizes(self.engine)]
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+        return self._chunks[0]
+
+    @data.setter
+    def data(self, data):
+        self._chunks = [pd.DataFrame(data)]
+        if self.engine is not None:
+            write_prizes(self.engine, self._chunks[0])
+        self.invalidate()
+
+    def append(self, rows):
+        """Add new prize rows (e.g. a new year); the aggregates are updated from these rows only."""
+        rows = pd.DataFrame(rows)
+        if self.engine is not None:
+            append_prizes(self.engine, rows)
+            if self._chunks:
+                self._chunks.append(rows)
+        else:
+            self._chunks.append(rows)
+            if self._aggregates is not None:
+                self._aggregates.update(rows)
+        self._laureate_index = None  # new names change the sorted index
+
+    def invalidate(self):
+        """Drop the derived aggregates and index; call after changing existing rows in place."""
+        if self.engine is None:
+            self._aggregates = None
+        self._laureate_index = None
+
+    @property
+    def aggregates(self) -> PrizeAggregates:
+        if self._aggregates is None:
+            self._aggregates = PrizeAggregates()
+            for chunk in self._chunks:
+                self._aggregates.update(chunk)
+        return self._aggregates
+
+    @property
+    def laureate_index(self) -> LaureateIndex:
+        if self._laureate_index is None:
+            self._laureate_index = LaureateIndex.from_frame(self.data)
+        return self._laureate_index
 
     def get_total_winners(self) -> int:
-        self.total_winners = self.data['count'].sum()
+        self.total_winners = self.aggregates.total()
         print('Total Nobel Laureates:', self.total_winners)
         return self.total_winners
 
     def get_total_winners_by_category(self) -> pd.Series:
-        self.total_winners_by_category = self.data.groupby('category')['count'].sum()
+        self.total_winners_by_category = self.aggregates.total_by_category()
         print('Total Nobel Laureates by Category:')
         print(self.total_winners_by_category)
         return self.total_winners_by_category
 
-    def calc_mean_counts_per_decade_by_category(self):
-        subset = self.data.copy()
-        subset['decade'] = subset['year'] // 10 * 10
+    def get_repeat_winners(self) -> pd.Series:
+        self.repeat_winners = self.laureate_index.repeat_winners()
+        print('Laureates with more than one Nobel Prize:')
+        print(self.repeat_winners)
+        return self.repeat_winners
 
-        # calculate mean of counts by decade and category
-        mean_counts = (
-            subset.groupby(['decade', 'category'])['count'].mean().reset_index()
-        )
-        return mean_counts
+    def get_laureate_prizes(self, name) -> pd.DataFrame:
+        return self.laureate_index.rows(name)[['year', 'category']]
+
+    def calc_mean_counts_per_decade_by_category(self):
+        # mean of counts by decade and category, from the running sums and counts
+        return self.aggregates.mean_by_decade_category()
 
     def plot_counts_per_decade_by_category(self):
         mean_counts = self.calc_mean_counts_per_decade_by_category()
@@ -65,8 +132,9 @@ class NobelData:
 
 
 if __name__ == '__main__':
-    data = pd.read_csv('data/nobel_prize_dataset.csv')
-    nobel_data = NobelData(data)
+    data = load_nobel_data('data/nobel_prize_dataset.csv')
+    nobel_data = NobelData(data, load_laureate_index('data/nobel_prize_dataset.csv'))
     nobel_data.get_total_winners()
     nobel_data.get_total_winners_by_category()
+    nobel_data.get_repeat_winners()
     nobel_data.plot_counts_per_decade_by_category()
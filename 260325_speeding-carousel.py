@@ -12,6 +12,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
 
+from speeding_grid import time_saved_grid
+
 # ── Design tokens ──────────────────────────────────────────────────────
 BG = '#F5C518'  # gold
 TEXT = '#1A1A1A'  # near-black
@@ -168,61 +170,36 @@ def slide_method():
     return fig
 
 
-def _build_analyses():
-    """Build the analysis objects (reuse logic from the main script)."""
-    # Panel 1: 60 mph, multiple distances
-    from dataclasses import dataclass
-
-    @dataclass
-    class Cfg:
-        baseline_mph: float
-        trip_miles_list: list
-        mph_over_range: np.ndarray
-        real_world_gain_factor_low: float
-        real_world_gain_factor_high: float
-        distance_colors: list
-
-    def _make(baseline, miles_list, colors):
-        return Cfg(
-            baseline_mph=baseline,
-            trip_miles_list=miles_list,
-            mph_over_range=np.arange(1.0, 26.0, 1.0),
-            real_world_gain_factor_low=0.30,
-            real_world_gain_factor_high=0.60,
-            distance_colors=colors,
-        )
-
-    def _lo(cfg, m):
-        actual = cfg.baseline_mph + cfg.mph_over_range
-        ideal = 60.0 * m * (1.0 / cfg.baseline_mph - 1.0 / actual)
-        return ideal * cfg.real_world_gain_factor_low
-
-    def _hi(cfg, m):
-        actual = cfg.baseline_mph + cfg.mph_over_range
-        ideal = 60.0 * m * (1.0 / cfg.baseline_mph - 1.0 / actual)
-        return ideal * cfg.real_world_gain_factor_high
-
-    return Cfg, _make, _lo, _hi
+def _build_grid():
+    """Minutes saved for every baseline and trip distance on the chart slides (one grid)."""
+    return time_saved_grid(
+        baselines=[35.0, 55.0, 60.0, 75.0],
+        trip_miles=[10.0, 30.0, 60.0, 70.0],
+        mph_over=np.arange(1.0, 26.0, 1.0),
+        gain_factor_low=0.30,
+        gain_factor_high=0.60,
+    )
 
 
 def slide_chart_distances():
     """Slide 4: chart + key numbers — 60 mph limit, by trip distance."""
-    Cfg, _make, _lo, _hi = _build_analyses()
-    cfg = _make(60.0, [10.0, 30.0, 70.0], ['#8B4513', '#C62828', '#1A1A1A'])
+    grid = _build_grid()
+    trip_miles_list = [10.0, 30.0, 70.0]
+    colors = ['#8B4513', '#C62828', '#1A1A1A']
 
     fig = _base_slide()
     ax = fig.add_axes([0.12, 0.32, 0.80, 0.46])
     ax.set_facecolor('#FFF8DC')  # cornsilk for chart area
-    x = cfg.mph_over_range
+    x = grid.mph_over
 
     y_max = 0.0
-    for m in cfg.trip_miles_list:
-        y_max = max(y_max, _hi(cfg, m).max())
+    for m in trip_miles_list:
+        y_max = max(y_max, grid.curve(60.0, m, 'high').max())
     y_max *= 1.15
 
-    for i, m in enumerate(cfg.trip_miles_list):
-        c = cfg.distance_colors[i]
-        lo, hi = _lo(cfg, m), _hi(cfg, m)
+    for i, m in enumerate(trip_miles_list):
+        c = colors[i]
+        lo, hi = grid.curve(60.0, m, 'low'), grid.curve(60.0, m, 'high')
         ax.fill_between(x, lo, hi, color=c, alpha=0.25)
         ax.plot(x, lo, color=c, lw=1.5, alpha=0.7)
         ax.plot(x, hi, color=c, lw=3, alpha=0.7, label=f'{int(m)} mi')
@@ -273,25 +250,23 @@ def slide_chart_distances():
 
 def slide_chart_speeds():
     """Slide 6: chart — 60-mile trip, by speed limit."""
-    Cfg, _make, _lo, _hi = _build_analyses()
+    grid = _build_grid()
     baselines = [35.0, 55.0, 75.0]
     colors = ['#8B4513', '#C62828', '#1A1A1A']
 
     fig = _base_slide()
     ax = fig.add_axes([0.12, 0.10, 0.80, 0.62])
     ax.set_facecolor('#FFF8DC')
-    x = np.arange(1.0, 26.0, 1.0)
+    x = grid.mph_over
 
     y_max = 0.0
     for b in baselines:
-        cfg = _make(b, [60.0], ['w'])
-        y_max = max(y_max, _hi(cfg, 60.0).max())
+        y_max = max(y_max, grid.curve(b, 60.0, 'high').max())
     y_max *= 1.15
 
     for i, b in enumerate(baselines):
-        cfg = _make(b, [60.0], [colors[i]])
         c = colors[i]
-        lo, hi = _lo(cfg, 60.0), _hi(cfg, 60.0)
+        lo, hi = grid.curve(b, 60.0, 'low'), grid.curve(b, 60.0, 'high')
         ax.fill_between(x, lo, hi, color=c, alpha=0.25)
         ax.plot(x, lo, color=c, lw=1.5, alpha=0.7)
         ax.plot(x, hi, color=c, lw=3, alpha=0.7, label=f'{int(b)} mph limit')
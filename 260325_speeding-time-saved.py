@@ -21,6 +21,8 @@ from dataclasses import dataclass
 import matplotlib.pyplot as plt
 import numpy as np
 
+from speeding_grid import TimeSavedGrid, time_saved_grid
+
 
 @dataclass
 class SpeedingConfig:
@@ -40,25 +42,33 @@ class SpeedingAnalysis:
     def __init__(self, config: SpeedingConfig):
         self.config = config
 
+    def grid(self, baselines=None, trip_miles=None, mph_over=None) -> TimeSavedGrid:
+        """
+        Minutes saved over baselines x trip distances x mph over, in one pass.
+
+        Each axis defaults to the config's (baseline_mph, trip_miles_list,
+        mph_over_range); the real-world factors are the config's.
+        """
+        cfg = self.config
+        return time_saved_grid(
+            cfg.baseline_mph if baselines is None else baselines,
+            cfg.trip_miles_list if trip_miles is None else trip_miles,
+            cfg.mph_over_range if mph_over is None else mph_over,
+            cfg.real_world_gain_factor_low,
+            cfg.real_world_gain_factor_high,
+        )
+
     def time_saved_idealized(self, trip_miles: float) -> np.ndarray:
         """Minutes saved per trip from pure speed increase (no friction)."""
-        cfg = self.config
-        actual_mph = cfg.baseline_mph + cfg.mph_over_range
-        return 60.0 * trip_miles * (1.0 / cfg.baseline_mph - 1.0 / actual_mph)
+        return self.grid(trip_miles=trip_miles).minutes[0, 0, :, 0]
 
     def time_saved_real_world_low(self, trip_miles: float) -> np.ndarray:
         """Lower bound of real-world minutes saved (conservative dilution)."""
-        return (
-            self.time_saved_idealized(trip_miles)
-            * self.config.real_world_gain_factor_low
-        )
+        return self.grid(trip_miles=trip_miles).minutes[0, 0, :, 1]
 
     def time_saved_real_world_high(self, trip_miles: float) -> np.ndarray:
         """Upper bound of real-world minutes saved (optimistic dilution)."""
-        return (
-            self.time_saved_idealized(trip_miles)
-            * self.config.real_world_gain_factor_high
-        )
+        return self.grid(trip_miles=trip_miles).minutes[0, 0, :, 2]
 
 
 def build_default_config(baseline_mph: float) -> SpeedingConfig:
@@ -79,35 +89,27 @@ if __name__ == '__main__':
 
     # Panel 2: 60-mile trip, multiple speed limits
     speed_baselines = [35.0, 55.0, 75.0]
-    speed_colors = ['tab:blue', 'tab:orange', 'tab:green']
-    speed_analyses = []
-    speed_labels = []
-    for i, base in enumerate(speed_baselines):
-        cfg = SpeedingConfig(
-            baseline_mph=base,
-            trip_miles_list=[60.0],
-            mph_over_range=np.arange(1.0, 26.0, 1.0),
-            real_world_gain_factor_low=0.30,
-            real_world_gain_factor_high=0.60,
-            distance_colors=[speed_colors[i]],
-        )
-        speed_analyses.append(SpeedingAnalysis(cfg))
-        speed_labels.append(f'{int(base)} mph')
+    speed_miles = 60.0
+    speed_labels = [f'{int(base)} mph' for base in speed_baselines]
+
+    # Both panels are slices of one grid over all baselines and distances
+    cfg1 = ana_distances.config
+    grid = ana_distances.grid(
+        baselines=[cfg1.baseline_mph, *speed_baselines],
+        trip_miles=[*cfg1.trip_miles_list, speed_miles],
+    )
 
     # Custom 2-panel figure
     fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
 
     # --- Panel 1: multiple distances, single baseline ---
-    cfg1 = ana_distances.config
     x = cfg1.mph_over_range
 
     y_max = 0.0
     for miles in cfg1.trip_miles_list:
-        y_max = max(y_max, ana_distances.time_saved_real_world_high(miles).max())
-    for sa in speed_analyses:
-        y_max = max(
-            y_max, sa.time_saved_real_world_high(sa.config.trip_miles_list[0]).max()
-        )
+        y_max = max(y_max, grid.curve(cfg1.baseline_mph, miles, 'high').max())
+    for base in speed_baselines:
+        y_max = max(y_max, grid.curve(base, speed_miles, 'high').max())
     y_max *= 1.15
 
     ax1 = axes[0]
@@ -121,8 +123,8 @@ if __name__ == '__main__':
     for i, miles in enumerate(cfg1.trip_miles_list):
         color = cfg1.distance_colors[i]
         label = f'{int(miles)} mi'
-        lo = ana_distances.time_saved_real_world_low(miles)
-        hi = ana_distances.time_saved_real_world_high(miles)
+        lo = grid.curve(cfg1.baseline_mph, miles, 'low')
+        hi = grid.curve(cfg1.baseline_mph, miles, 'high')
         ax1.fill_between(x, lo, hi, color=color, alpha=0.25)
         ax1.plot(x, lo, color=color, lw=1, alpha=0.6)
         ax1.plot(x, hi, color=color, lw=1, alpha=0.6, label=label)
@@ -137,12 +139,11 @@ if __name__ == '__main__':
     ax2.grid(alpha=0.25)
 
     colors2 = ['tab:blue', 'tab:orange', 'tab:green']
-    for i, sa in enumerate(speed_analyses):
-        miles = sa.config.trip_miles_list[0]
+    for i, base in enumerate(speed_baselines):
         color = colors2[i]
         label = speed_labels[i]
-        lo = sa.time_saved_real_world_low(miles)
-        hi = sa.time_saved_real_world_high(miles)
+        lo = grid.curve(base, speed_miles, 'low')
+        hi = grid.curve(base, speed_miles, 'high')
         ax2.fill_between(x, lo, hi, color=color, alpha=0.25)
         ax2.plot(x, lo, color=color, lw=1, alpha=0.6)
         ax2.plot(x, hi, color=color, lw=1, alpha=0.6, label=label)
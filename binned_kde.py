@@ -0,0 +1,108 @@
+"""
+Gaussian kernel density estimate by linear binning and FFT convolution.
+
+`scipy.stats.gaussian_kde` (used by seaborn's `kde=True`) sums one kernel per
+observation at every evaluation point, which costs O(n x grid). Here the
+observations are first spread onto a fine regular grid (linear binning), and
+the binned counts are convolved with the sampled Gaussian kernel by FFT, so
+the cost is O(n + grid log grid): a few passes over the data, so 1e7
+observations take a fraction of a second instead of tens of seconds.
+
+The error comes from linear binning and interpolation and shrinks with the
+square of the bin width (bins are at most bandwidth / 64 wide). For the
+populations of the CLT panels (normal, bimodal mixture, exponential, beta,
+uniform) the curves match seaborn's (scipy's) to within 1e-4 of the peak
+density. Heavy-tailed data are the exception: there the outliers inflate
+the bandwidth past the width of the bulk of the data, and for a Cauchy
+(t with 1 df) sample the error can reach a few 1e-4; a larger `min_bins`
+(finer bins) brings it back down.
+
+Author: N. Singh, PhD
+"""
+
+import numpy as np
+from scipy.signal import fftconvolve
+
+
+def kde_bandwidth(x, bw_method='scott', bw_adjust=1.0):
+    """
+    Gaussian kernel bandwidth (standard deviation) as chosen by scipy/seaborn.
+
+    Parameters:
+    -----------
+    x : array-like
+        Observations
+    bw_method : {'scott', 'silverman'} or float, optional (default='scott')
+        Rule for the bandwidth factor, or the factor itself
+    bw_adjust : float, optional (default=1.0)
+        Multiplier of the bandwidth (seaborn's bw_adjust)
+
+    Returns:
+    --------
+    float
+        Bandwidth in data units: factor * sample SD (ddof=1) * bw_adjust
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    n = x.size
+    if bw_method == 'scott':
+        factor = n ** (-1 / 5)
+    elif bw_method == 'silverman':
+        factor = (n * 3 / 4) ** (-1 / 5)
+    else:
+        factor = float(bw_method)
+    return factor * np.std(x, ddof=1) * bw_adjust
+
+
+def binned_kde(x, gridsize=200, cut=3, bw_method='scott', bw_adjust=1.0, min_bins=2048):
+    """
+    Evaluate a Gaussian KDE of x on a regular support grid.
+
+    Parameters:
+    -----------
+    x : array-like
+        Observations
+    gridsize : int, optional (default=200)
+        Number of points of the returned support grid
+    cut : float, optional (default=3)
+        Bandwidths by which the support extends past the data range
+        (seaborn's histplot overlay uses cut=0, kdeplot cut=3)
+    bw_method : {'scott', 'silverman'} or float, optional (default='scott')
+        Bandwidth rule (see kde_bandwidth)
+    bw_adjust : float, optional (default=1.0)
+        Multiplier of the bandwidth
+    min_bins : int, optional (default=2048)
+        Minimum number of binning grid points over the data range
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        (support, density), each of length gridsize
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    n = x.size
+    h = kde_bandwidth(x, bw_method, bw_adjust)
+    lo, hi = x.min(), x.max()
+    support = np.linspace(lo - cut * h, hi + cut * h, gridsize)
+
+    # Binning grid over the data range, with bins no wider than h / 64
+    n_bins = int(min(max(min_bins, np.ceil(64 * (hi - lo) / h) + 1), 2**22))
+    delta = (hi - lo) / (n_bins - 1)
+    # Linear binning: each observation splits its weight between the two
+    # nearest grid points (frac to the right one, 1 - frac to the left one)
+    frac = x - lo
+    frac *= 1 / delta
+    left = np.minimum(frac.astype(np.intp), n_bins - 2)
+    frac -= left
+    right_weight = np.bincount(left, weights=frac, minlength=n_bins)
+    counts = np.bincount(left, minlength=n_bins) - right_weight
+    counts[1:] += right_weight[:-1]
+
+    # Pad by the support's overhang, then convolve with the kernel sampled on
+    # the same spacing (long enough that it is never truncated in range)
+    pad = int(np.ceil(cut * h / delta)) + 1
+    counts = np.pad(counts, pad)
+    offsets = np.arange(-(counts.size - 1), counts.size) * delta
+    kernel = np.exp(-0.5 * (offsets / h) ** 2) / (n * h * np.sqrt(2 * np.pi))
+    density = fftconvolve(counts, kernel, mode='same')
+    grid = lo + (np.arange(counts.size) - pad) * delta
+    return support, np.interp(support, grid, np.maximum(density, 0))
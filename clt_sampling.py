@@ -0,0 +1,326 @@
+"""
+Sampling distributions of the mean for the CLT posts.
+
+`sample_means` draws many replicate samples of size n from a population and
+returns their means. Draws are made as `(replicates x n)` blocks capped at
+`max_elements` values, and reduced row by row. Where the sum of n draws has a
+known distribution (normal, Poisson, exponential -> gamma, and the normal
+mixture given its binomial component counts) the sums are drawn directly,
+so the cost no longer grows with n. The populations without such a law
+(beta, uniform) can instead split the replicates across worker processes,
+each drawing from its own child stream.
+
+`frame_counts` and `build_clt_animation` animate a sampling distribution as
+replicates arrive: each frame only bins its new replicates (`np.bincount`)
+onto running counts, and the figure updates a single `stairs` artist in
+place, so the cost per frame does not grow with the number of frames.
+
+Author: N. Singh, PhD
+"""
+
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+from scipy.stats import norm
+
+from streaming_stats import HistogramAccumulator
+
+
+class Population(NamedTuple):
+    """A population to sample from, with its mean and standard deviation."""
+
+    draw: Callable            # draw(rng, shape) -> array of draws
+    mean: float
+    sd: float
+    draw_sum: Optional[Callable] = None  # draw_sum(rng, n, size) -> sums of n draws
+    lattice: Optional[float] = None  # step of the values of a discrete population
+
+
+# Module-level samplers (not lambdas), so populations can be sent to worker processes
+def _normal_draw(rng, shape):
+    return rng.normal(0, 1, shape)
+
+
+def _normal_draw_sum(rng, n, size):
+    return rng.normal(0, np.sqrt(n), size)
+
+
+def _bimodal_draw(rng, shape):
+    component = rng.random(shape) < 0.5
+    return np.where(component, rng.normal(-2, 0.5, shape), rng.normal(3, 1, shape))
+
+
+def _bimodal_draw_sum(rng, n, size):
+    # given k draws from the first component, the sum is normal
+    k = rng.binomial(n, 0.5, size)
+    return rng.normal(-2 * k + 3 * (n - k), np.sqrt(0.25 * k + 1.0 * (n - k)))
+
+
+def _exponential_draw(rng, shape):
+    return rng.exponential(1, shape)
+
+
+def _exponential_draw_sum(rng, n, size):
+    return rng.gamma(n, 1, size)
+
+
+def _poisson_draw(rng, shape):
+    return rng.poisson(3, shape)
+
+
+def _poisson_draw_sum(rng, n, size):
+    return rng.poisson(3 * n, size)
+
+
+def _beta_draw(rng, shape):
+    return rng.beta(2, 5, shape)
+
+
+def _uniform_draw(rng, shape):
+    return rng.random(shape)
+
+
+# The populations of 241018_CLT-pop-dists.py (the bimodal one as a 50/50 mixture)
+POPULATIONS = {
+    "Normal": Population(
+        draw=_normal_draw,
+        mean=0.0,
+        sd=1.0,
+        draw_sum=_normal_draw_sum,
+    ),
+    "Bimodal": Population(
+        draw=_bimodal_draw,
+        mean=0.5,
+        sd=np.sqrt(0.5 * (0.25 + 4) + 0.5 * (1 + 9) - 0.5**2),
+        draw_sum=_bimodal_draw_sum,
+    ),
+    "Exponential": Population(
+        draw=_exponential_draw,
+        mean=1.0,
+        sd=1.0,
+        draw_sum=_exponential_draw_sum,
+    ),
+    "Poisson": Population(
+        draw=_poisson_draw,
+        mean=3.0,
+        sd=np.sqrt(3),
+        draw_sum=_poisson_draw_sum,
+        lattice=1.0,
+    ),
+    "Beta": Population(
+        draw=_beta_draw,
+        mean=2 / 7,
+        sd=np.sqrt(2 * 5 / ((2 + 5) ** 2 * (2 + 5 + 1))),
+    ),
+    "Uniform": Population(
+        draw=_uniform_draw,
+        mean=0.5,
+        sd=np.sqrt(1 / 12),
+    ),
+}
+
+
+def _blocked_means(population, n, replicates, rng, max_elements):
+    """Sample means from (rows x n) blocks of draws; also the worker entry point."""
+    means = np.empty(replicates)
+    rows = max(1, max_elements // n)
+    for start in range(0, replicates, rows):
+        stop = min(start + rows, replicates)
+        means[start:stop] = population.draw(rng, (stop - start, n)).mean(axis=1)
+    return means
+
+
+def sample_means(population, n, replicates, rng=None, max_elements=2**24, shortcut=True,
+                 workers=1):
+    """
+    Means of `replicates` independent samples of size n from a population.
+
+    Without a sum shortcut, the draws can be split across processes: with
+    workers > 1 the replicates are divided into `workers` shards, each drawn
+    from its own child of rng (`Generator.spawn`, i.e. SeedSequence.spawn) and
+    run in a forked worker process (on Linux; elsewhere the shards run in
+    turn in this process), and the shard means are concatenated in order. The
+    result therefore depends on rng and workers, but not on where the shards
+    ran.
+
+    Parameters:
+    -----------
+    population : Population
+        Population to sample from (e.g. POPULATIONS["Beta"])
+    n : int
+        Sample size
+    replicates : int
+        Number of samples (means) to draw
+    rng : numpy.random.Generator, optional
+        Random generator (default: a fresh unseeded one)
+    max_elements : int, optional (default=2**24)
+        Maximum number of draws held in memory at once
+    shortcut : bool, optional (default=True)
+        Draw the sums directly where the population defines draw_sum
+    workers : int, optional (default=1)
+        Number of shards / worker processes for populations drawn in blocks
+        (each worker holds up to max_elements draws)
+
+    Returns:
+    --------
+    numpy.ndarray
+        One sample mean per replicate
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if shortcut and population.draw_sum is not None:
+        return population.draw_sum(rng, n, replicates) / n
+
+    if workers <= 1:
+        return _blocked_means(population, n, replicates, rng, max_elements)
+
+    bounds = np.linspace(0, replicates, workers + 1).astype(np.int64)
+    jobs = [(population, n, int(stop - start), child, max_elements)
+            for start, stop, child in zip(bounds[:-1], bounds[1:], rng.spawn(workers))]
+    if not sys.platform.startswith('linux'):
+        return np.concatenate([_blocked_means(*job) for job in jobs])
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        return np.concatenate(list(pool.map(_blocked_means, *zip(*jobs))))
+
+
+def standardized_means(population, n, replicates, rng=None, **kwargs):
+    """
+    Sample means standardized by the population: (mean - mu) / (sigma / sqrt(n)).
+
+    By the CLT these approach a standard normal distribution as n grows.
+    Keyword arguments are passed to sample_means.
+    """
+    means = sample_means(population, n, replicates, rng, **kwargs)
+    return (means - population.mean) / (population.sd / np.sqrt(n))
+
+
+def standardized_edges(population, n, lo=-5.0, hi=5.0, width=0.1):
+    """
+    Histogram bin edges for standardized sample means of size n.
+
+    For a continuous population these are regular bins of the given width.
+    The standardized means of a discrete (lattice) population only take
+    values spaced lattice / (sd * sqrt(n)) apart; fixed-width bins would then
+    hold alternately more and fewer of those values (a comb of spikes), so
+    the bins are instead a whole number of lattice steps wide (the nearest
+    to `width`) and centred on lattice points.
+
+    Parameters:
+    -----------
+    population : Population
+        Population sampled
+    n : int
+        Sample size
+    lo, hi : float, optional (default=-5.0, 5.0)
+        Range to cover (standardized units)
+    width : float, optional (default=0.1)
+        Target bin width
+
+    Returns:
+    --------
+    numpy.ndarray
+        Bin edges covering [lo, hi]
+    """
+    if population.lattice is None:
+        return np.linspace(lo, hi, int(round((hi - lo) / width)) + 1)
+    scale = population.sd * np.sqrt(n)
+    step = population.lattice / scale
+    bin_width = max(1, round(width / step)) * step
+    # standardized value of a sample sum of 0 (a lattice point), less half a step
+    origin = -n * population.mean / scale - step / 2
+    first = np.floor((lo - origin) / bin_width)
+    last = np.ceil((hi - origin) / bin_width)
+    return origin + np.arange(first, last + 1) * bin_width
+
+
+def frame_counts(population, n, replicates_per_frame, n_frames, edges, rng=None, **kwargs):
+    """
+    Running histogram counts of standardized sample means, one row per frame.
+
+    Each frame draws replicates_per_frame new standardized means and adds only
+    those to the running counts.
+
+    Parameters:
+    -----------
+    population : Population
+        Population to sample from
+    n : int
+        Sample size
+    replicates_per_frame : int
+        Number of new sample means per frame
+    n_frames : int
+        Number of frames
+    edges : array-like
+        Histogram bin edges (standardized units)
+    rng : numpy.random.Generator, optional
+        Random generator (default: a fresh unseeded one)
+    **kwargs
+        Passed to sample_means (max_elements, shortcut, workers)
+
+    Returns:
+    --------
+    numpy.ndarray
+        (n_frames x bins) cumulative counts; row f covers frames 0..f
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    hist = HistogramAccumulator(edges)
+    counts = np.empty((n_frames, hist.counts.size), dtype=np.int64)
+    for frame in range(n_frames):
+        hist.update(standardized_means(population, n, replicates_per_frame, rng, **kwargs))
+        counts[frame] = hist.counts
+    return counts
+
+
+def build_clt_animation(counts, edges, title, replicates_per_frame):
+    """
+    Build the animated sampling-distribution figure and its frame-update function.
+
+    For animation_render.save_animation, or FuncAnimation(..., blit=True) for
+    live display: update(frame) only sets the data of one stairs artist and
+    one text artist (both inside the axes) and returns them.
+
+    Parameters:
+    -----------
+    counts : numpy.ndarray
+        (n_frames x bins) cumulative counts from frame_counts
+    edges : array-like
+        Histogram bin edges
+    title : str
+        Axes title
+    replicates_per_frame : int
+        New sample means per frame (for the replicate counter)
+
+    Returns:
+    --------
+    tuple
+        (figure, update function drawing frame number `frame`)
+    """
+    edges = np.asarray(edges, dtype=float)
+    widths = np.diff(edges)
+    densities = counts / (counts.sum(axis=1, keepdims=True) * widths)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    z = np.linspace(edges[0], edges[-1], 400)
+    ax.plot(z, norm.pdf(z), color="black", linestyle="--", label="Standard Normal")
+    steps = ax.stairs(densities[0], edges, fill=True, alpha=0.6, label="Sample means")
+    counter = ax.text(0.02, 0.95, "", transform=ax.transAxes, va="top")
+    # Fixed limits from all frames, so no frame needs a rescale
+    ax.set_xlim(edges[0], edges[-1])
+    ax.set_ylim(0, 1.05 * max(densities.max(), norm.pdf(0)))
+    ax.set_xlabel("Standardized Sample Mean")
+    ax.set_ylabel("Density")
+    ax.set_title(title)
+    ax.text(0.98, 0.95, "https://n.singh.phd", transform=ax.transAxes, ha="right", va="top",
+            fontsize=10, color="gray")
+    ax.legend(loc="upper right", bbox_to_anchor=(1, 0.9))
+
+    def update(frame):
+        """Animation function: show the running histogram after `frame + 1` batches."""
+        steps.set_data(densities[frame])
+        counter.set_text(f"{(frame + 1) * replicates_per_frame:,} sample means")
+        return steps, counter
+
+    return fig, update
@@ -0,0 +1,250 @@
+"""
+SQL pushdown backend for the Nobel prize rows (SQLAlchemy; SQLite locally).
+
+The pandas path of `NobelData` loads every prize row and groups them in
+memory. With an engine, the rows live in a `prizes` table instead and the
+summaries run in the database as `GROUP BY` queries: only the handful of
+result rows (one per category, or per decade and category) come back.
+
+The table carries an index on (category, year), extended with `count` so
+that it covers every column the aggregates read: the queries then scan the
+index alone (in category order, so `GROUP BY category` needs no sort)
+rather than the table with its long `names` strings, and a filter on one
+category becomes an index range scan.
+
+Run this module to benchmark the pushdown against loading the (cached)
+table into pandas.
+
+Author: N. Singh, PhD
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    Table,
+    Text,
+    create_engine,
+    func,
+    select,
+)
+
+from nobel_store import PrizeAggregates, synthetic_laureates
+
+metadata = MetaData()
+
+prizes = Table(
+    'prizes',
+    metadata,
+    Column('year', SmallInteger, nullable=False),
+    Column('category', Text, nullable=False),
+    Column('names', Text),
+    Column('count', Integer, nullable=False),
+)
+
+category_year_index = Index(
+    'ix_prizes_category_year', prizes.c.category, prizes.c.year, prizes.c['count']
+)
+
+_INSERT = 'INSERT INTO prizes (year, category, names, count) VALUES (?, ?, ?, ?)'
+
+
+def sqlite_engine(path='data/nobel_prize_dataset.sqlite'):
+    """Engine for a local SQLite stand-in of the prize database."""
+    return create_engine(f'sqlite:///{path}')
+
+
+def _insert_rows(conn, rows):
+    rows = pd.DataFrame(rows)
+    records = zip(
+        rows['year'].astype(int).tolist(),
+        rows['category'].astype(str).tolist(),
+        rows['names'].tolist(),
+        rows['count'].astype(int).tolist(),
+    )
+    conn.exec_driver_sql(_INSERT, list(records))
+
+
+def write_prizes(engine, chunks, replace=True):
+    """
+    Bulk-load prize rows into the prizes table and (re)build its index.
+
+    The index is dropped during the load and built once afterwards, which is
+    much cheaper than maintaining it row by row.
+
+    Parameters:
+    -----------
+    engine : sqlalchemy.engine.Engine
+        Target database
+    chunks : pandas.DataFrame or iterable of DataFrames
+        Prize rows (columns year, category, names, count)
+    replace : bool, optional (default=True)
+        Drop existing rows first
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    with engine.begin() as conn:
+        if replace:
+            prizes.drop(conn, checkfirst=True)
+        prizes.create(conn, checkfirst=True)
+        category_year_index.drop(conn, checkfirst=True)
+        for chunk in chunks:
+            _insert_rows(conn, chunk)
+        category_year_index.create(conn)
+        conn.exec_driver_sql('ANALYZE')
+
+
+def append_prizes(engine, rows):
+    """Insert new prize rows (e.g. a new year); the index is kept up to date."""
+    with engine.begin() as conn:
+        _insert_rows(conn, rows)
+
+
+def read_prizes(engine):
+    """All prize rows as a DataFrame (the columns of load_nobel_data)."""
+    data = pd.read_sql(select(prizes), engine)
+    return data.astype({'year': 'int16', 'category': 'category'})
+
+
+class SqlPrizeAggregates:
+    """
+    The summaries of PrizeAggregates, computed in the database.
+
+    Each call runs one `GROUP BY` query over the prizes table, so the
+    results always reflect the rows in the database and nothing needs to be
+    updated or invalidated on the Python side.
+
+    Parameters:
+    -----------
+    engine : sqlalchemy.engine.Engine
+        Database holding the prizes table
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def _query(self, statement):
+        with self.engine.connect() as conn:
+            result = conn.execute(statement)
+            return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+    def total(self):
+        """Sum of count over all rows."""
+        with self.engine.connect() as conn:
+            return int(conn.execute(select(func.coalesce(func.sum(prizes.c['count']), 0))).scalar())
+
+    def total_by_category(self):
+        """Sum of count per category."""
+        statement = (
+            select(prizes.c.category, func.sum(prizes.c['count']).label('count'))
+            .group_by(prizes.c.category)
+            .order_by(prizes.c.category)
+        )
+        return self._query(statement).set_index('category')['count'].astype(np.int64)
+
+    def mean_by_decade_category(self):
+        """
+        Mean count per (decade, category), as columns decade, category, count.
+
+        The database groups by (category, year), the order of the index, so
+        the groups stream out of one index scan without a sort; the few
+        hundred per-year sums and counts are then rolled up to decades.
+        """
+        statement = select(
+            prizes.c.category,
+            prizes.c.year,
+            func.sum(prizes.c['count']).label('sum'),
+            func.count().label('count'),
+        ).group_by(prizes.c.category, prizes.c.year)
+        per_year = self._query(statement)
+        decade = (per_year['year'].astype(np.int64) // 10 * 10).rename('decade')
+        totals = per_year.groupby([decade, 'category'])[['sum', 'count']].sum()
+        return (totals['sum'] / totals['count']).rename('count').reset_index()
+
+
+def _synthetic_chunks(n_rows, chunk_rows):
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        yield synthetic_laureates(min(chunk_rows, n_rows - start), seed=i)
+
+
+def benchmark(sizes=(1_000_000, 10_000_000, 100_000_000), pandas_max_rows=20_000_000,
+              chunk_rows=5_000_000, workdir=None):
+    """
+    Time the summaries by SQL pushdown against the pandas path.
+
+    The pandas path loads the memory-mapped Feather cache into a DataFrame
+    and groups it (what NobelData does without an engine); the SQL path only
+    runs the queries. Tables larger than pandas_max_rows are not loaded into
+    pandas, since they would not fit in memory.
+
+    Parameters:
+    -----------
+    sizes : sequence of int, optional
+        Synthetic table sizes (rows)
+    pandas_max_rows : int, optional (default=20,000,000)
+        Largest table timed on the pandas path
+    chunk_rows : int, optional (default=5,000,000)
+        Rows generated and written at a time
+    workdir : str, optional
+        Directory for the files (default: a temporary directory)
+    """
+
+    def timed(label, func):
+        start = time.perf_counter()
+        result = func()
+        print(f'{label:<36}{time.perf_counter() - start:8.3f} s')
+        return result
+
+    def summaries(aggregates):
+        aggregates.total()
+        aggregates.total_by_category()
+        return aggregates.mean_by_decade_category()
+
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            print(f'{n_rows:,} rows')
+            engine = sqlite_engine(os.path.join(tmp, 'prizes.sqlite'))
+            feather_path = os.path.join(tmp, 'prizes.feather')
+            use_pandas = n_rows <= pandas_max_rows
+
+            def load():
+                tables = []
+
+                def chunks():
+                    for chunk in _synthetic_chunks(n_rows, chunk_rows):
+                        if use_pandas:
+                            tables.append(pa.Table.from_pandas(chunk, preserve_index=False))
+                        yield chunk
+
+                write_prizes(engine, chunks())
+                if use_pandas:
+                    feather.write_feather(
+                        pa.concat_tables(tables), feather_path, compression='uncompressed'
+                    )
+
+            timed('generate + load (SQLite, Feather)', load)
+            sql_means = timed('SQL GROUP BY pushdown', lambda: summaries(SqlPrizeAggregates(engine)))
+            if use_pandas:
+                def pandas_path():
+                    data = feather.read_table(feather_path, memory_map=True).to_pandas()
+                    return summaries(PrizeAggregates().update(data))
+
+                pandas_means = timed('pandas (load + groupby)', pandas_path)
+                assert np.allclose(sql_means['count'], pandas_means['count'])
+            else:
+                print(f'{"pandas (load + groupby)":<36}  skipped (does not fit in memory)')
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,428 @@
+"""
+Columnar on-disk cache for the Nobel laureate dataset.
+
+`load_nobel_data` parses `data/nobel_prize_dataset.csv` once and keeps a
+Feather (Arrow IPC) copy next to it, with `year` as int16 and `category` as
+a categorical (Arrow dictionary) column. Later loads memory-map the cache
+instead of re-parsing the text. The cache records the source file's size,
+mtime and SHA-256 in its schema metadata: it is used as-is while size and
+mtime match, re-validated by hash when only the mtime changed (e.g. after a
+checkout), and rebuilt when the content changed.
+
+`load_laureate_index` adds a laureate-level view: the semicolon-joined
+`names` are exploded once into one row per (laureate, prize), sorted by
+name, with a sorted-name index for exact and prefix lookups by binary
+search. Both are persisted as Feather files next to the cache and rebuilt
+whenever the source hash changes.
+
+`PrizeAggregates` keeps the running sums and counts of `count` per category
+and per (decade, category), so the summaries are read from a handful of
+groups and rows arriving later (a new prize year) are folded in without
+regrouping the whole table.
+
+Run this module to benchmark the CSV and cached loads on a synthetic table.
+
+Author: N. Singh, PhD
+"""
+
+import bisect
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+CSV_DTYPES = {'year': 'int16', 'category': 'category'}
+_META_KEYS = (b'source_size', b'source_mtime_ns', b'source_sha256')
+
+
+def cache_path_for(csv_path):
+    """Path of the Feather cache kept next to a CSV file."""
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_metadata(csv_path, sha256=None):
+    stat = os.stat(csv_path)
+    return {
+        b'source_size': str(stat.st_size).encode(),
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+        b'source_sha256': (sha256 or file_sha256(csv_path)).encode(),
+    }
+
+
+def _write_cache(table, cache_path, source_metadata):
+    """Write the table with the source metadata, atomically replacing the cache."""
+    metadata = {**(table.schema.metadata or {}), **source_metadata}
+    # a temp file of our own in the same directory, so that concurrent
+    # writers never share one and os.replace stays atomic
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(cache_path)), suffix='.tmp', delete=False
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        # uncompressed, so that later loads can memory-map the columns
+        feather.write_feather(
+            table.replace_schema_metadata(metadata), tmp_path, compression='uncompressed'
+        )
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_cache(cache_path):
+    """Memory-mapped Arrow table of the cache."""
+    return feather.read_table(cache_path, memory_map=True)
+
+
+def load_nobel_table(csv_path='data/nobel_prize_dataset.csv', cache_path=None, refresh=False):
+    """
+    Load the dataset as an Arrow table, from the cache when it is current.
+
+    Parameters:
+    -----------
+    csv_path : str
+        Source CSV (columns year, category, names, count)
+    cache_path : str, optional
+        Feather cache path (default: the CSV path with a .feather extension)
+    refresh : bool, optional (default=False)
+        Rebuild the cache even if it is current
+
+    Returns:
+    --------
+    pyarrow.Table
+        The dataset; memory-mapped when read from the cache
+    """
+    cache_path = cache_path or cache_path_for(csv_path)
+    if not refresh and os.path.exists(cache_path):
+        table = _read_cache(cache_path)
+        cached = table.schema.metadata or {}
+        current = _source_metadata(csv_path, sha256='-')
+        if all(key in cached for key in _META_KEYS):
+            if (cached[b'source_size'], cached[b'source_mtime_ns']) == (
+                current[b'source_size'], current[b'source_mtime_ns']
+            ):
+                return table
+            sha256 = file_sha256(csv_path)
+            if cached[b'source_sha256'] == sha256.encode():
+                # same content, new mtime: record it so the next load skips the hash
+                _write_cache(table, cache_path, _source_metadata(csv_path, sha256))
+                return _read_cache(cache_path)
+
+    data = pd.read_csv(csv_path, dtype=CSV_DTYPES)
+    _write_cache(
+        pa.Table.from_pandas(data, preserve_index=False), cache_path, _source_metadata(csv_path)
+    )
+    return _read_cache(cache_path)
+
+
+def load_nobel_data(csv_path='data/nobel_prize_dataset.csv', cache_path=None, refresh=False):
+    """
+    Load the dataset as a DataFrame, through the Feather cache.
+
+    Parameters are those of load_nobel_table.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Columns year (int16), category (categorical), names, count
+    """
+    return load_nobel_table(csv_path, cache_path, refresh).to_pandas()
+
+
+class PrizeAggregates:
+    """
+    Running sums and counts of prize rows' `count`, per category and per
+    (decade, category).
+
+    `update` groups only the rows it is given and adds their sums and counts
+    onto the running totals, so appending rows costs O(rows appended +
+    groups). Aggregates are exact under appends; they do not see changes to
+    rows already added (rebuild them then).
+
+    Attributes:
+    -----------
+    by_category : pandas.DataFrame
+        Columns sum, count indexed by category
+    by_decade_category : pandas.DataFrame
+        Columns sum, count indexed by (decade, category)
+    """
+
+    def __init__(self):
+        self.by_category = self._empty(['category'])
+        self.by_decade_category = self._empty(['decade', 'category'])
+
+    @staticmethod
+    def _empty(keys):
+        index = pd.MultiIndex.from_arrays([[]] * len(keys), names=keys)
+        if len(keys) == 1:
+            index = index.get_level_values(0)
+        return pd.DataFrame({'sum': [], 'count': []}, index=index, dtype=np.int64)
+
+    @staticmethod
+    def _add(totals, rows, keys):
+        new = rows['count'].groupby(keys, observed=True).agg(['sum', 'count'])
+        return totals.add(new, fill_value=0).astype(np.int64).sort_index()
+
+    def update(self, rows):
+        """
+        Add prize rows (columns year, category, count).
+
+        Parameters:
+        -----------
+        rows : pandas.DataFrame
+            New rows
+
+        Returns:
+        --------
+        PrizeAggregates
+            self, so calls can be chained
+        """
+        if len(rows) == 0:
+            return self
+        # plain string keys, so categoricals with different categories add up
+        category = rows['category'].astype(str).rename('category')
+        decade = (rows['year'].astype(np.int64) // 10 * 10).rename('decade')
+        self.by_category = self._add(self.by_category, rows, [category])
+        self.by_decade_category = self._add(self.by_decade_category, rows, [decade, category])
+        return self
+
+    def total(self):
+        """Sum of count over all rows."""
+        return int(self.by_category['sum'].sum())
+
+    def total_by_category(self):
+        """Sum of count per category."""
+        return self.by_category['sum'].rename('count')
+
+    def mean_by_decade_category(self):
+        """Mean count per (decade, category), as columns decade, category, count."""
+        means = self.by_decade_category['sum'] / self.by_decade_category['count']
+        return means.rename('count').reset_index()
+
+
+class _SortedNames:
+    """Read-only sequence view of an Arrow string array, for bisect."""
+
+    def __init__(self, names):
+        self.names = names
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        return self.names[i].as_py()
+
+
+class LaureateIndex:
+    """
+    Laureate-level table of the dataset with a name index.
+
+    The index is the sorted array of unique names, kept as Arrow strings (so
+    it can stay memory-mapped), plus the offsets of each name's rows in the
+    laureate table: a name or a prefix is found by binary search in
+    O(log names), without building a per-process hash table of every name.
+
+    Attributes:
+    -----------
+    laureates : pandas.DataFrame
+        One row per (laureate, prize) of the awarded prizes: name_code
+        (position in names), prize_row (row of the prize in the source data),
+        year, category; sorted by name, then prize_row
+    names : pyarrow.ChunkedArray
+        Sorted unique names
+    offsets : numpy.ndarray
+        laureates rows of names[i] are offsets[i]:offsets[i + 1]
+    """
+
+    def __init__(self, laureates, names, offsets):
+        self.laureates = laureates
+        self.names = pa.chunked_array([names]) if isinstance(names, pa.Array) else names
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._sorted = _SortedNames(self.names)
+
+    @classmethod
+    def from_frame(cls, data):
+        """
+        Build the index from prize rows (columns year, category, names, count).
+
+        The names are split and exploded in one vectorized pass (Arrow
+        compute kernels, which avoid a Python list per prize) and coded
+        against the sorted unique names. Prizes with a zero count (the "No
+        award" rows) have no laureates and are skipped.
+        """
+        awarded = np.flatnonzero(data['count'].to_numpy() > 0)
+        names = pa.array(data['names'])
+        if isinstance(names, pa.ChunkedArray):
+            names = names.combine_chunks()
+        split = pc.split_pattern(names.take(awarded), ';')
+        prize_row = awarded[pc.list_parent_indices(split).to_numpy()]
+        encoded = pc.dictionary_encode(pc.utf8_trim_whitespace(pc.list_flatten(split)))
+        # recode against the sorted dictionary
+        by_name = pc.array_sort_indices(encoded.dictionary).to_numpy()
+        rank = np.empty_like(by_name)
+        rank[by_name] = np.arange(by_name.size)
+        codes = rank[encoded.indices.to_numpy()]
+        names = encoded.dictionary.take(by_name)
+        order = np.argsort(codes, kind='stable')  # prize rows stay in order per name
+        prize_row = prize_row[order]
+        laureates = pd.DataFrame({
+            'name_code': codes[order].astype(np.int32),
+            'prize_row': prize_row.astype(np.int32),
+            'year': data['year'].to_numpy()[prize_row],
+            'category': data['category'].iloc[prize_row].reset_index(drop=True),
+        })
+        offsets = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(names)))]
+        return cls(laureates, names, offsets)
+
+    def find(self, name):
+        """Position of name in names, or None if it is unknown."""
+        i = bisect.bisect_left(self._sorted, name)
+        return i if i < len(self.names) and self._sorted[i] == name else None
+
+    def rows(self, name):
+        """Laureate rows of one name (empty if unknown), with the name column added."""
+        i = self.find(name)
+        if i is None:
+            return self.laureates.iloc[:0].assign(name=pd.Series(dtype=str))
+        return self.laureates.iloc[self.offsets[i]:self.offsets[i + 1]].assign(name=name)
+
+    def search(self, prefix):
+        """Names starting with prefix (sorted)."""
+        start = bisect.bisect_left(self._sorted, prefix)
+        stop = bisect.bisect_left(self._sorted, prefix + chr(0x10FFFF), lo=start)
+        return self.names.slice(start, stop - start).to_pylist()
+
+    def repeat_winners(self):
+        """Names with more than one prize, with their prize counts."""
+        counts = np.diff(self.offsets)
+        repeat = counts > 1
+        return pd.Series(
+            counts[repeat], index=self.names.filter(pa.array(repeat)).to_pylist(), name='prizes'
+        )
+
+
+def _index_paths(cache_path):
+    stem = os.path.splitext(cache_path)[0]
+    return f'{stem}.laureates.feather', f'{stem}.names.feather'
+
+
+def load_laureate_index(csv_path='data/nobel_prize_dataset.csv', cache_path=None, refresh=False):
+    """
+    Load the LaureateIndex, from its Feather files when they match the source.
+
+    Parameters are those of load_nobel_table; the index files are kept next
+    to the cache (<stem>.laureates.feather and <stem>.names.feather) and are
+    tagged with the source hash. The names stay memory-mapped.
+
+    Returns:
+    --------
+    LaureateIndex
+    """
+    cache_path = cache_path or cache_path_for(csv_path)
+    table = load_nobel_table(csv_path, cache_path, refresh)
+    source = {key: table.schema.metadata[key] for key in _META_KEYS}
+    laureates_path, names_path = _index_paths(cache_path)
+
+    if not refresh and os.path.exists(laureates_path) and os.path.exists(names_path):
+        laureates = _read_cache(laureates_path)
+        names = _read_cache(names_path)
+        if all(
+            (t.schema.metadata or {}).get(b'source_sha256') == source[b'source_sha256']
+            for t in (laureates, names)
+        ):
+            offsets = np.r_[0, names.column('stop').to_numpy()]
+            return LaureateIndex(laureates.to_pandas(), names.column('name'), offsets)
+
+    index = LaureateIndex.from_frame(table.to_pandas())
+    _write_cache(pa.Table.from_pandas(index.laureates, preserve_index=False), laureates_path, source)
+    names = pa.table({'name': index.names, 'stop': index.offsets[1:]})
+    _write_cache(names, names_path, source)
+    return index
+
+
+def synthetic_laureates(n_rows, seed=0):
+    """
+    Synthetic table shaped like the Nobel dataset, for benchmarking.
+
+    Parameters:
+    -----------
+    n_rows : int
+        Number of prize rows
+    seed : int, optional (default=0)
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Columns year, category, names ('; '-joined), count (1-3)
+    """
+    rng = np.random.default_rng(seed)
+    categories = np.array(['Physics', 'Chemistry', 'Physiology or Medicine',
+                           'Literature', 'Peace', 'Economic Sciences'])
+    counts = rng.integers(1, 4, n_rows)
+    first_id = np.cumsum(counts) - counts
+    ids = pd.Series(first_id).astype(str)
+    names = 'Laureate ' + ids
+    for k in (2, 3):
+        extra = 'Laureate ' + pd.Series(first_id + k - 1).astype(str)
+        names = names.where(counts < k, names + '; ' + extra)
+    return pd.DataFrame({
+        'year': rng.integers(1901, 2026, n_rows),
+        'category': categories[rng.integers(0, categories.size, n_rows)],
+        'names': names,
+        'count': counts,
+    })
+
+
+def benchmark(n_rows=10_000_000, workdir=None):
+    """
+    Time CSV parsing against cold (build) and warm (memory-mapped) cache loads.
+
+    Parameters:
+    -----------
+    n_rows : int, optional (default=10,000,000)
+        Rows of the synthetic table
+    workdir : str, optional
+        Directory for the files (default: a temporary directory)
+    """
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        csv_path = os.path.join(tmp, 'laureates.csv')
+        synthetic_laureates(n_rows).to_csv(csv_path, index=False)
+
+        def timed(label, func):
+            start = time.perf_counter()
+            result = func()
+            print(f'{label:<32}{time.perf_counter() - start:8.3f} s')
+            return result
+
+        print(f'{n_rows:,} rows, CSV {os.path.getsize(csv_path) / 1e6:,.0f} MB')
+        timed('pd.read_csv', lambda: pd.read_csv(csv_path, dtype=CSV_DTYPES))
+        timed('cache build (CSV -> Feather)', lambda: load_nobel_table(csv_path))
+        timed('cached Arrow table (mmap)', lambda: load_nobel_table(csv_path))
+        timed('cached DataFrame', lambda: load_nobel_data(csv_path))
+        os.utime(csv_path)  # new mtime, same content
+        timed('re-validation by hash', lambda: load_nobel_table(csv_path))
+        timed('laureate index build', lambda: load_laureate_index(csv_path))
+        index = timed('laureate index load', lambda: load_laureate_index(csv_path))
+        name = index.names[len(index.names) // 2].as_py()
+        timed('name lookup (x1000)', lambda: [index.rows(name) for _ in range(1000)])
+        timed('prefix search (x1000)', lambda: [index.search('Laureate 12345') for _ in range(1000)])
+
+
+if __name__ == '__main__':
+    benchmark()
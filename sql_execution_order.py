@@ -0,0 +1,370 @@
+"""
+Benchmark harness for the query of 260611_SQL-execution_order.sql.
+
+`write_orders_dataset` generates synthetic `customers` and `orders` tables
+with vectorized NumPy, in batches, and writes them as Arrow IPC (Feather)
+files. `load_sqlite` bulk-loads those files into SQLite with `executemany`
+(one batch at a time), so the scale is bounded by disk rather than memory.
+
+`benchmark` then runs the post's query on SQLite without and with an index
+on `orders(order_date, customer_id)`, records `EXPLAIN QUERY PLAN` for
+both, and times the same logic written with pandas and with
+pyarrow.compute.
+
+`stream_top_customers` evaluates the query without materializing the
+orders or the join: it reads `orders` one record batch at a time, filters
+the dates, adds the batch to running per-customer sums and counts, and
+after the HAVING cut selects the top k with a partial sort of the sums.
+Memory stays at one batch plus the per-customer totals, whatever the
+number of orders (`benchmark_streaming` runs it on 100M orders).
+
+Dates are ISO strings in SQLite (so that `>=` compares them as the query
+expects) and Arrow date32 values in the files.
+
+Author: N. Singh, PhD
+"""
+
+import os
+import resource
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+QUERY_PATH = '260611_SQL-execution_order.sql'
+ORDER_DATE_INDEX = 'CREATE INDEX ix_orders_date_customer ON orders (order_date, customer_id)'
+MIN_DATE = '2024-01-01'
+MIN_TOTAL = 500
+TOP_K = 10
+
+_FIRST_DAY = np.datetime64('2020-01-01')
+_N_DAYS = (np.datetime64('2026-01-01') - _FIRST_DAY).astype(int)  # orders span 2020-2025
+
+
+def read_query(path=QUERY_PATH):
+    """The query of the post, without its trailing semicolon."""
+    with open(path) as f:
+        return f.read().strip().rstrip(';')
+
+
+def synthetic_customers(n_customers):
+    """
+    Customers table: customer_id 0..n-1 and customer_name.
+
+    Returns:
+    --------
+    pyarrow.Table
+    """
+    ids = np.arange(n_customers, dtype=np.int32)
+    names = pc.binary_join_element_wise('Customer ', pa.array(ids).cast(pa.string()), '')
+    return pa.table({'customer_id': ids, 'customer_name': names})
+
+
+def synthetic_orders(n_orders, n_customers, first_order_id=0, rng=None):
+    """
+    A batch of orders: order_id, customer_id, order_date, amount.
+
+    Customers are drawn uniformly, dates uniformly over 2020-2025, and
+    amounts from a gamma distribution (mean 60) rounded to cents.
+
+    Parameters:
+    -----------
+    n_orders : int
+        Number of orders
+    n_customers : int
+        Number of customers to draw from
+    first_order_id : int, optional (default=0)
+        order_id of the first order
+    rng : numpy.random.Generator, optional
+        Random generator (default: a fresh unseeded one)
+
+    Returns:
+    --------
+    pyarrow.RecordBatch
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    days = rng.integers(0, _N_DAYS, n_orders)
+    return pa.record_batch({
+        'order_id': np.arange(first_order_id, first_order_id + n_orders, dtype=np.int64),
+        'customer_id': rng.integers(0, n_customers, n_orders, dtype=np.int32),
+        'order_date': pa.array(_FIRST_DAY + days, pa.date32()),
+        'amount': np.round(rng.gamma(2.0, 30.0, n_orders), 2),
+    })
+
+
+def write_orders_dataset(directory, n_orders, n_customers=None, batch_rows=2**22, seed=0):
+    """
+    Write customers.feather and orders.feather (in record batches) to directory.
+
+    Parameters:
+    -----------
+    directory : str
+        Output directory
+    n_orders : int
+        Number of orders
+    n_customers : int, optional
+        Number of customers (default: one per 100 orders)
+    batch_rows : int, optional (default=2**22)
+        Orders generated and written per record batch
+    seed : int, optional (default=0)
+        Random seed
+
+    Returns:
+    --------
+    tuple of str
+        (customers path, orders path)
+    """
+    n_customers = n_customers or max(1, n_orders // 100)
+    rng = np.random.default_rng(seed)
+    customers_path = os.path.join(directory, 'customers.feather')
+    orders_path = os.path.join(directory, 'orders.feather')
+    feather.write_feather(synthetic_customers(n_customers), customers_path, compression='uncompressed')
+
+    batch = synthetic_orders(1, 1)
+    with ipc.new_file(orders_path, batch.schema) as writer:
+        for start in range(0, n_orders, batch_rows):
+            writer.write_batch(
+                synthetic_orders(min(batch_rows, n_orders - start), n_customers, start, rng)
+            )
+    return customers_path, orders_path
+
+
+def _batches(path, memory_map=True):
+    # without memory mapping every batch is read into its own buffers, which
+    # are released with the batch (mapped pages would stay resident)
+    with (pa.memory_map(path) if memory_map else pa.OSFile(path)) as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def load_sqlite(db_path, customers_path, orders_path):
+    """
+    Bulk-load the Feather files into a new SQLite database (no indexes).
+
+    Each record batch is inserted with one `executemany` call, inside a
+    single transaction.
+
+    Returns:
+    --------
+    sqlite3.Connection
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name TEXT NOT NULL);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL,
+            order_date TEXT NOT NULL,
+            amount REAL NOT NULL
+        );
+    """)
+    with conn:
+        for batch in _batches(customers_path):
+            conn.executemany(
+                'INSERT INTO customers VALUES (?, ?)',
+                zip(*(column.to_pylist() for column in batch.columns)),
+            )
+        for batch in _batches(orders_path):
+            # ISO date strings, so that order_date >= '2024-01-01' compares correctly
+            dates = batch.column('order_date').cast(pa.string())
+            columns = [batch.column('order_id'), batch.column('customer_id'), dates,
+                       batch.column('amount')]
+            conn.executemany(
+                'INSERT INTO orders VALUES (?, ?, ?, ?)',
+                zip(*(column.to_pylist() for column in columns)),
+            )
+    return conn
+
+
+def query_plan(conn, query):
+    """`EXPLAIN QUERY PLAN` of query, one line per plan step."""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}')]
+
+
+def run_sqlite(conn, query):
+    """Result of the query as a DataFrame."""
+    cursor = conn.execute(query)
+    return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+
+def run_pandas(customers_path, orders_path, min_date=MIN_DATE, min_total=MIN_TOTAL, k=TOP_K):
+    """
+    The query with pandas, step by step in SQL's logical order.
+
+    FROM/JOIN, WHERE, GROUP BY, HAVING, SELECT, ORDER BY, LIMIT.
+    """
+    customers = feather.read_feather(customers_path)
+    orders = feather.read_table(orders_path, memory_map=True).to_pandas(date_as_object=False)
+    joined = customers.merge(orders, on='customer_id')
+    joined = joined[joined['order_date'] >= pd.Timestamp(min_date)]
+    groups = joined.groupby(['customer_id', 'customer_name'], observed=True).agg(
+        total_orders=('order_id', 'count'), total_spent=('amount', 'sum')
+    )
+    groups = groups[groups['total_spent'] > min_total]
+    result = groups.reset_index()[['customer_name', 'total_orders', 'total_spent']]
+    return result.sort_values('total_spent', ascending=False).head(k).reset_index(drop=True)
+
+
+def run_arrow(customers_path, orders_path, min_date=MIN_DATE, min_total=MIN_TOTAL, k=TOP_K):
+    """
+    The query with pyarrow.compute.
+
+    Filters and aggregates orders first and joins the names to the
+    aggregated customers only (the plan a database would choose).
+    """
+    orders = feather.read_table(orders_path, memory_map=True)
+    recent = orders.filter(pc.field('order_date') >= pa.scalar(pd.Timestamp(min_date).date()))
+    groups = recent.group_by('customer_id').aggregate([('order_id', 'count'), ('amount', 'sum')])
+    groups = groups.filter(pc.field('amount_sum') > min_total)
+    top = groups.take(pc.select_k_unstable(groups, k, [('amount_sum', 'descending')]))
+    named = top.join(feather.read_table(customers_path), 'customer_id')
+    named = named.sort_by([('amount_sum', 'descending')])
+    return pd.DataFrame({
+        'customer_name': named.column('customer_name').to_pandas(),
+        'total_orders': named.column('order_id_count').to_pandas(),
+        'total_spent': named.column('amount_sum').to_pandas(),
+    })
+
+
+def stream_top_customers(customers_path, orders_path, min_date=MIN_DATE, min_total=MIN_TOTAL,
+                         k=TOP_K):
+    """
+    The query evaluated over the orders in a single streaming pass.
+
+    customer_id is a dense integer key, so the hash aggregate is a direct-
+    address table: np.bincount of each filtered batch is added to running
+    sums and counts indexed by customer_id. Only the k winners' names are
+    looked up, so the join touches k customers instead of every order.
+
+    Parameters:
+    -----------
+    customers_path, orders_path : str
+        Feather files from write_orders_dataset
+    min_date : str, optional (default='2024-01-01')
+        WHERE order_date >= min_date
+    min_total : float, optional (default=500)
+        HAVING SUM(amount) > min_total
+    k : int, optional (default=10)
+        LIMIT
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Columns customer_name, total_orders, total_spent
+    """
+    min_day = pa.scalar(pd.Timestamp(min_date).date())
+    sums = np.zeros(0)
+    counts = np.zeros(0, dtype=np.int64)
+    for batch in _batches(orders_path, memory_map=False):
+        recent = batch.filter(pc.greater_equal(batch.column('order_date'), min_day))
+        ids = recent.column('customer_id').to_numpy()
+        if ids.size == 0:
+            continue
+        size = max(sums.size, int(ids.max()) + 1)
+        if size > sums.size:
+            sums = np.pad(sums, (0, size - sums.size))
+            counts = np.pad(counts, (0, size - counts.size))
+        sums += np.bincount(ids, weights=recent.column('amount').to_numpy(), minlength=size)
+        counts += np.bincount(ids, minlength=size)
+
+    # HAVING, then the k largest sums by partial sort (the rest left in place)
+    having = np.where(sums > min_total, sums, -np.inf)
+    k = min(k, int(np.count_nonzero(sums > min_total)))
+    top = np.argpartition(having, having.size - k)[having.size - k:] if k else np.zeros(0, np.intp)
+    top = top[np.lexsort((top, -sums[top]))].tolist()
+
+    names = {}
+    wanted = pa.array(top, pa.int32())
+    for batch in _batches(customers_path, memory_map=False):
+        matches = batch.filter(pc.is_in(batch.column('customer_id'), wanted))
+        names.update(zip(*(column.to_pylist() for column in matches.columns)))
+    return pd.DataFrame({
+        'customer_name': [names[i] for i in top],
+        'total_orders': counts[top],
+        'total_spent': sums[top],
+    })
+
+
+def check_same(result, expected):
+    """Raise AssertionError unless two query results agree (sums to 1e-6)."""
+    assert list(result['customer_name']) == list(expected['customer_name'])
+    assert list(result['total_orders']) == list(expected['total_orders'])
+    assert np.allclose(result['total_spent'], expected['total_spent'], rtol=0, atol=1e-6)
+
+
+def benchmark(sizes=(1_000_000, 10_000_000), workdir=None):
+    """
+    Time the query on SQLite (without and with the index), pandas and pyarrow.
+
+    Parameters:
+    -----------
+    sizes : sequence of int, optional
+        Numbers of orders (e.g. up to 100_000_000; the data are generated
+        and loaded in batches, but the pandas path holds the whole joined
+        table in memory)
+    workdir : str, optional
+        Directory for the files (default: a temporary directory)
+    """
+    query = read_query()
+
+    def timed(label, func):
+        start = time.perf_counter()
+        result = func()
+        print(f'{label:<36}{time.perf_counter() - start:8.3f} s')
+        return result
+
+    for n_orders in sizes:
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            print(f'{n_orders:,} orders, {max(1, n_orders // 100):,} customers')
+            paths = timed('generate (NumPy -> Feather)', lambda: write_orders_dataset(tmp, n_orders))
+            conn = timed('load (executemany -> SQLite)',
+                         lambda: load_sqlite(os.path.join(tmp, 'orders.sqlite'), *paths))
+
+            print('  plan:', '; '.join(query_plan(conn, query)))
+            expected = timed('SQLite, no index', lambda: run_sqlite(conn, query))
+            timed('create index', lambda: conn.execute(ORDER_DATE_INDEX))
+            conn.execute('ANALYZE')
+            print('  plan:', '; '.join(query_plan(conn, query)))
+            check_same(timed('SQLite, index', lambda: run_sqlite(conn, query)), expected)
+            conn.close()
+
+            check_same(timed('pandas', lambda: run_pandas(*paths)), expected)
+            check_same(timed('pyarrow.compute', lambda: run_arrow(*paths)), expected)
+            check_same(timed('streaming top-k', lambda: stream_top_customers(*paths)), expected)
+
+
+def benchmark_streaming(n_orders=100_000_000, workdir=None):
+    """
+    Run stream_top_customers on a large orders file and report its memory.
+
+    The peak resident memory covers generating the file too, which is also
+    done one batch at a time.
+
+    Parameters:
+    -----------
+    n_orders : int, optional (default=100,000,000)
+        Number of orders
+    workdir : str, optional
+        Directory for the files (default: a temporary directory)
+    """
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        paths = write_orders_dataset(tmp, n_orders)
+        size = os.path.getsize(paths[1]) / 1e6
+        start = time.perf_counter()
+        result = stream_top_customers(*paths)
+        elapsed = time.perf_counter() - start
+    print(result)
+    print(f'{n_orders:,} orders ({size:,.0f} MB): {elapsed:.1f} s, '
+          f'peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3:,.0f} MB, '
+          f'peak Arrow memory {pa.default_memory_pool().max_memory() / 1e6:,.0f} MB')
+
+
+if __name__ == '__main__':
+    benchmark()
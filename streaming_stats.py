@@ -0,0 +1,351 @@
+"""
+Single-pass, mergeable summary statistics for streamed or sharded samples.
+
+The moment posts compute their summaries with separate full passes over a
+sample held in memory (`np.mean`, `np.var`, `scipy.stats.skew`, ...). The
+accumulators here instead consume the data chunk by chunk and can be merged,
+so the same numbers can be computed over samples far larger than memory, or
+over shards processed in parallel and combined afterwards.
+
+Author: N. Singh, PhD
+"""
+
+import itertools
+import warnings
+
+import numpy as np
+
+
+class MomentAccumulator:
+    """
+    Running count, mean and central moment sums M2, M3, M4.
+
+    Each chunk's moments are computed exactly (two passes over the chunk) and
+    combined with the running totals using the pairwise update formulas of
+    Terriberry and Pébay. For a single chunk the results are therefore those
+    of numpy/scipy on the same array.
+
+    Parameters:
+    -----------
+    order : int, optional (default=4)
+        Highest central moment kept: 2 skips M3 and M4 (and skew/kurtosis)
+        for callers that only need the mean and variance
+
+    Attributes:
+    -----------
+    count : int
+        Number of observations seen
+    mean : float
+        Running mean
+    m2, m3, m4 : float
+        Sums of the 2nd, 3rd and 4th powers of deviations from the mean
+    """
+
+    def __init__(self, order=4):
+        if order not in (2, 4):
+            raise ValueError("order must be 2 or 4")
+        self.order = order
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def update(self, chunk):
+        """
+        Add a chunk of observations.
+
+        Parameters:
+        -----------
+        chunk : array-like
+            Observations (flattened)
+
+        Returns:
+        --------
+        MomentAccumulator
+            self, so calls can be chained
+        """
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if chunk.size == 0:
+            return self
+        other = MomentAccumulator(self.order)
+        other.count = chunk.size
+        other.mean = np.mean(chunk)
+        dev = chunk - other.mean
+        dev2 = dev * dev
+        other.m2 = dev2.sum()
+        if self.order == 4:
+            other.m3 = (dev2 * dev).sum()
+            other.m4 = (dev2 * dev2).sum()
+        return self.merge(other)
+
+    def merge(self, other):
+        """
+        Combine with the moments of another (disjoint) set of observations.
+
+        Parameters:
+        -----------
+        other : MomentAccumulator
+            Accumulator over other observations, e.g. from another process,
+            of at least this one's order
+
+        Returns:
+        --------
+        MomentAccumulator
+            self, updated in place to cover both sets
+        """
+        if other.order < self.order:
+            raise ValueError("Cannot merge moments of a lower order")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean = other.count, other.mean
+            self.m2, self.m3, self.m4 = other.m2, other.m3, other.m4
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        if self.order == 2:
+            self.count, self.mean, self.m2 = n, self.mean + delta_n * nb, m2
+            return self
+
+        m4 = (
+            self.m4 + other.m4
+            + delta * delta_n**3 * na * nb * (na * na - na * nb + nb * nb)
+            + 6 * delta_n**2 * (na * na * other.m2 + nb * nb * self.m2)
+            + 4 * delta_n * (na * other.m3 - nb * self.m3)
+        )
+        m3 = (
+            self.m3 + other.m3
+            + delta * delta_n**2 * na * nb * (na - nb)
+            + 3 * delta_n * (na * other.m2 - nb * self.m2)
+        )
+
+        self.count = n
+        self.mean = self.mean + delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    def var(self, ddof=0):
+        """Variance (ddof=0 matches np.var)."""
+        return self.m2 / (self.count - ddof)
+
+    def skew(self):
+        """Biased sample skewness (matches scipy.stats.skew defaults)."""
+        if self.order < 4:
+            raise ValueError("skew needs an accumulator of order 4")
+        m2 = self.m2 / self.count
+        return (self.m3 / self.count) / m2**1.5
+
+    def kurtosis(self):
+        """Biased excess kurtosis (matches scipy.stats.kurtosis defaults)."""
+        if self.order < 4:
+            raise ValueError("kurtosis needs an accumulator of order 4")
+        m2 = self.m2 / self.count
+        return (self.m4 / self.count) / m2**2 - 3.0
+
+
+class HistogramAccumulator:
+    """
+    Fixed-bin histogram filled chunk by chunk.
+
+    Each chunk is reduced to bin indices and counted with `np.bincount`, so
+    only the counts are kept. Values outside the edges are counted separately
+    (underflow/overflow) and left out of the density, as with `np.histogram`.
+    Bins follow numpy's convention: half-open [left, right), except the last,
+    which includes its right edge.
+
+    Attributes:
+    -----------
+    edges : numpy.ndarray
+        Bin edges (monotonically increasing)
+    counts : numpy.ndarray
+        Counts per bin (int64)
+    underflow, overflow : int
+        Counts below the first / above the last edge
+    min, max : float
+        Smallest and largest value seen
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.min = np.inf
+        self.max = -np.inf
+        widths = np.diff(self.edges)
+        self._uniform = np.allclose(widths, widths[0])
+
+    @classmethod
+    def from_pilot(cls, pilot, bins=30, discrete=False, pad=0.0):
+        """
+        Create an accumulator with bins chosen from a pilot sample.
+
+        Parameters:
+        -----------
+        pilot : array-like
+            Pilot sample (e.g. the first chunk of a stream)
+        bins : int or str, optional (default=30)
+            Passed to `np.histogram_bin_edges` over the pilot's range, so for
+            a pilot that is the whole sample the bins equal those of ax.hist
+        discrete : bool, optional (default=False)
+            If True, use unit-width bins centred on the integers in the
+            pilot's range (seaborn's discrete=True); bins is ignored
+        pad : float, optional (default=0.0)
+            Fraction of the pilot's range added on each side, to leave room
+            for values outside the pilot's range
+
+        Returns:
+        --------
+        HistogramAccumulator
+        """
+        pilot = np.asarray(pilot, dtype=float).ravel()
+        lo, hi = pilot.min(), pilot.max()
+        if discrete:
+            extra = np.ceil(pad * (hi - lo))
+            edges = np.arange(lo - extra - 0.5, hi + extra + 1.5)
+        else:
+            extra = pad * (hi - lo)
+            edges = np.histogram_bin_edges(pilot, bins, range=(lo - extra, hi + extra))
+        return cls(edges)
+
+    @classmethod
+    def from_stream(cls, chunks, bins=30, discrete=False, pad=0.5, accumulators=(), name=None):
+        """
+        Histogram a stream of chunks, with bins chosen from its first chunk.
+
+        A stream of one chunk is the whole sample, so its bins are exactly
+        those of from_pilot without padding (what ax.hist would use). For
+        longer streams the first chunk's range is widened by `pad` on each
+        side, and a warning reports any later draws still outside the bins.
+
+        Parameters:
+        -----------
+        chunks : iterable of array-like
+            The observations, chunk by chunk (e.g. a generator of draws)
+        bins, discrete : optional
+            As for from_pilot
+        pad : float, optional (default=0.5)
+            Fraction of the first chunk's range added on each side when the
+            stream has more than one chunk
+        accumulators : sequence, optional (default=())
+            Other accumulators (e.g. a MomentAccumulator) updated with the
+            same chunks
+        name : str, optional
+            Label of the sample in the out-of-range warning
+
+        Returns:
+        --------
+        tuple
+            (HistogramAccumulator, first chunk as a flat float array)
+        """
+        chunks = iter(chunks)
+        pilot = np.asarray(next(chunks), dtype=float).ravel()
+        following = next(chunks, None)
+        hist = cls.from_pilot(pilot, bins=bins, discrete=discrete,
+                              pad=0.0 if following is None else pad)
+        rest = () if following is None else itertools.chain([following], chunks)
+        for chunk in itertools.chain([pilot], rest):
+            hist.update(chunk)
+            for acc in accumulators:
+                acc.update(chunk)
+
+        if hist.underflow or hist.overflow:
+            warnings.warn(
+                f"{name or 'sample'}: {hist.underflow + hist.overflow:,} draws outside the "
+                f"histogram range [{hist.edges[0]:.3g}, {hist.edges[-1]:.3g}] left out of the density",
+                stacklevel=2,
+            )
+        return hist, pilot
+
+    def update(self, chunk):
+        """
+        Add a chunk of observations.
+
+        Parameters:
+        -----------
+        chunk : array-like
+            Observations (flattened)
+
+        Returns:
+        --------
+        HistogramAccumulator
+            self, so calls can be chained
+        """
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if chunk.size == 0:
+            return self
+        self.min = min(self.min, chunk.min())
+        self.max = max(self.max, chunk.max())
+
+        first, last = self.edges[0], self.edges[-1]
+        below = chunk < first
+        above = chunk > last
+        self.underflow += int(below.sum())
+        self.overflow += int(above.sum())
+        inside = chunk[~(below | above)]
+
+        n_bins = self.counts.size
+        if self._uniform:
+            idx = ((inside - first) * (n_bins / (last - first))).astype(np.intp)
+            # floating-point rounding near an edge: settle with the exact edges
+            idx -= inside < self.edges[idx]
+            idx += (inside >= self.edges[np.minimum(idx + 1, n_bins)]) & (idx < n_bins - 1)
+        else:
+            idx = np.searchsorted(self.edges, inside, side='right') - 1
+        np.minimum(idx, n_bins - 1, out=idx)  # the last bin is closed
+        self.counts += np.bincount(idx, minlength=n_bins)
+        return self
+
+    def merge(self, other):
+        """
+        Add the counts of another accumulator with the same edges.
+
+        Parameters:
+        -----------
+        other : HistogramAccumulator
+            Accumulator over other observations, e.g. from another process
+
+        Returns:
+        --------
+        HistogramAccumulator
+            self, updated in place
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def density(self):
+        """Counts normalized to integrate to 1 over the edges (np.histogram's density=True)."""
+        return self.counts / (self.counts.sum() * np.diff(self.edges))
+
+    def stairs(self, ax, density=True, fill=True, **kwargs):
+        """
+        Draw the histogram with `ax.stairs`.
+
+        Parameters:
+        -----------
+        ax : matplotlib.axes.Axes
+            Axes to draw on
+        density : bool, optional (default=True)
+            Plot densities instead of raw counts
+        fill : bool, optional (default=True)
+            Fill the area under the steps, like ax.hist bars
+        **kwargs
+            Passed to `ax.stairs` (color, alpha, label, ...)
+
+        Returns:
+        --------
+        matplotlib.patches.StepPatch
+        """
+        values = self.density() if density else self.counts
+        return ax.stairs(values, self.edges, fill=fill, **kwargs)